@@ -12,6 +12,7 @@ from pathlib import Path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.utils.config_loader import load_config
+from src.utils.table_io import read_table, table_exists
 
 # --- Configuration & Setup ---
 st.set_page_config(
@@ -43,16 +44,16 @@ def get_clusters():
 
 @st.cache_data
 def load_main_data():
-    if os.path.exists(config.paths.cluster_data):
-        df = pd.read_csv(config.paths.cluster_data)
+    if table_exists(config.paths.cluster_data):
+        df = read_table(config.paths.cluster_data)
         df['publish_date'] = pd.to_datetime(df['publish_date'])
         return df
     return pd.DataFrame()
 
 @st.cache_data
 def load_analyzed_data():
-    if os.path.exists(config.paths.analyzed_data):
-        df = pd.read_csv(config.paths.analyzed_data)
+    if table_exists(config.paths.analyzed_data):
+        df = read_table(config.paths.analyzed_data)
         df['publish_date'] = pd.to_datetime(df['publish_date'])
         return df
     return pd.DataFrame()
@@ -122,8 +122,8 @@ if __name__ == '__main__':
     # Generate sample data
     df = generate_sample_data(num_videos_per_cluster=70)
 
-    # Save to CSV
-    df.to_csv('data/analyzed_data.csv', index=False)
+    # Save to Parquet
+    df.to_parquet('data/analyzed_data.parquet', index=False)
     print(f'Created sample analyzed data with {len(df)} videos')
     print(f'\nVideos per cluster:')
     print(df['cluster'].value_counts())
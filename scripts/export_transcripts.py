@@ -23,6 +23,8 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.utils.table_io import read_table, table_exists
+
 
 def load_cached_transcripts(cache_dir="data/cache/transcripts"):
     """Load all cached transcripts."""
@@ -57,13 +59,13 @@ def load_cached_transcripts(cache_dir="data/cache/transcripts"):
     return transcripts
 
 
-def merge_with_metadata(transcripts, analyzed_data_path="data/analyzed_data.csv"):
+def merge_with_metadata(transcripts, analyzed_data_path="data/analyzed_data.parquet"):
     """Merge transcripts with video metadata and analysis."""
-    if not os.path.exists(analyzed_data_path):
+    if not table_exists(analyzed_data_path):
         print(f"⚠️  Analyzed data not found: {analyzed_data_path}")
         return transcripts
 
-    df = pd.read_csv(analyzed_data_path)
+    df = read_table(analyzed_data_path)
 
     # Create transcript lookup
     transcript_dict = {t['video_id']: t for t in transcripts}
@@ -9,6 +9,9 @@ import matplotlib.pyplot as plt
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from src.utils.config_loader import load_config
+from src.utils.table_io import read_table
+
 def generate_word_cloud(text, filename, title):
     """Generate word cloud from text."""
     custom_stopwords = set(STOPWORDS)
@@ -39,7 +42,7 @@ def main():
     print("🚀 Generating Theme Word Clouds...")
 
     # Load analyzed data
-    df = pd.read_csv('data/analyzed_data.csv')
+    df = read_table(load_config().paths.analyzed_data)
 
     # Filter to videos with themes
     df_with_themes = df[df['themes'].notna()]
@@ -18,12 +18,16 @@ from src.utils.logger import setup_logger, QuotaTracker
 from src.utils.cache_manager import CacheManager
 from src.utils.metadata_manager import MetadataManager
 from src.utils.rate_limiter import TranscriptRateLimiter
+from src.utils.table_io import read_table, write_table, table_exists
 from src.temporal_analysis import save_historical_snapshot
 
 # --- Core Functions ---
 
-def get_transcript(video_id, cache_manager, logger, rate_limiter=None):
-    """Fetches the full transcript text for a given video ID."""
+def get_transcript(video_id, cache_manager, logger, rate_limiter=None, http_client=None):
+    """Fetches the full transcript text for a given video ID.
+
+    Pass a shared requests.Session as http_client to reuse pooled connections.
+    """
     # Check cache first
     cached_transcript = cache_manager.get_transcript(video_id)
     if cached_transcript:
@@ -33,7 +37,7 @@ def get_transcript(video_id, cache_manager, logger, rate_limiter=None):
     try:
         @(rate_limiter.rate_limit_transcript_fetch if rate_limiter else lambda f: f)
         def _fetch_transcript():
-            api = YouTubeTranscriptApi()
+            api = YouTubeTranscriptApi(http_client=http_client)
 
             # Use .fetch() with multiple language codes to catch auto-generated or variant English
             # This version of the library (1.2.3) uses .fetch() instead of .get_transcript()
@@ -183,6 +187,72 @@ def process_video(row, ollama_url, cache_manager, config, logger, quota_tracker,
     return result
 
 
+def check_ollama_connection(ollama_url, model, logger):
+    """Checks that Ollama is reachable and serves the configured model."""
+    try:
+        test_response = requests.get(f"{ollama_url}/api/tags", timeout=5)
+        if test_response.status_code == 200:
+            models = test_response.json().get('models', [])
+            model_names = [m['name'] for m in models]
+            logger.info(f"✓ Connected to Ollama at {ollama_url}")
+            logger.info(f"  Available models: {', '.join(model_names)}")
+
+            # Check if configured model is available
+            if model not in model_names:
+                logger.warning(f"⚠️  Model '{model}' not found in Ollama")
+                logger.warning(f"   Available models: {', '.join(model_names)}")
+                logger.warning(f"   Please run: ollama pull {model}")
+                return False
+            return True
+        else:
+            logger.error(f"Failed to connect to Ollama at {ollama_url}")
+            return False
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Cannot connect to Ollama at {ollama_url}: {e}")
+        logger.error("Please ensure Ollama is running: ollama serve")
+        return False
+
+
+def analyze_batches(batch_queue, config, logger, workers):
+    """Analyzes ingested batches as they arrive to warm the analysis cache.
+
+    Consumes DataFrames from batch_queue until a None sentinel. Results are
+    only written to the transcript/analysis cache; a following run_analysis
+    assembles the enriched CSV from cache hits. The queue is drained up to
+    the sentinel even if setup or analysis fails, so the producer never
+    blocks on a full queue.
+    """
+    received_sentinel = False
+    try:
+        ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
+        if not check_ollama_connection(ollama_url, config.analysis.model, logger):
+            return
+
+        quota_tracker = QuotaTracker(logger, daily_limit=config.rate_limiting.youtube_api.daily_quota_limit)
+        cache_manager = CacheManager(config.analysis.cache_dir, logger)
+        transcript_rate_limiter = TranscriptRateLimiter(config, logger)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            while (batch := batch_queue.get()) is not None:
+                logger.info(f"Analyzing ingested batch of {len(batch)} videos...")
+                for row in batch.to_dict('records'):
+                    future = executor.submit(process_video, row, ollama_url, cache_manager, config, logger,
+                                             quota_tracker, transcript_rate_limiter)
+                    futures[future] = row['video_id']
+            received_sentinel = True
+
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Error processing video {futures[future]}: {e}")
+    finally:
+        if not received_sentinel:
+            while batch_queue.get() is not None:
+                pass
+
+
 def run_analysis():
     """Main function to orchestrate the transcript fetching and AI analysis."""
     import argparse
@@ -217,30 +287,11 @@ def run_analysis():
     ollama_url = os.getenv("OLLAMA_URL", "http://localhost:11434")
 
     # Test Ollama connection
-    try:
-        test_response = requests.get(f"{ollama_url}/api/tags", timeout=5)
-        if test_response.status_code == 200:
-            models = test_response.json().get('models', [])
-            model_names = [m['name'] for m in models]
-            logger.info(f"✓ Connected to Ollama at {ollama_url}")
-            logger.info(f"  Available models: {', '.join(model_names)}")
-
-            # Check if configured model is available
-            if config.analysis.model not in model_names:
-                logger.warning(f"⚠️  Model '{config.analysis.model}' not found in Ollama")
-                logger.warning(f"   Available models: {', '.join(model_names)}")
-                logger.warning(f"   Please run: ollama pull {config.analysis.model}")
-                return
-        else:
-            logger.error(f"Failed to connect to Ollama at {ollama_url}")
-            return
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Cannot connect to Ollama at {ollama_url}: {e}")
-        logger.error("Please ensure Ollama is running: ollama serve")
+    if not check_ollama_connection(ollama_url, config.analysis.model, logger):
         return
 
     try:
-        df = pd.read_csv(config.paths.cluster_data)
+        df = read_table(config.paths.cluster_data)
     except FileNotFoundError:
         logger.error(f"Input data file not found at {config.paths.cluster_data}. Run ingest.py first.")
         return
@@ -307,9 +358,9 @@ def run_analysis():
 
     # In incremental mode, merge with existing data
     output_path = config.paths.analyzed_data
-    if incremental_mode and os.path.exists(output_path):
+    if incremental_mode and table_exists(output_path):
         logger.info("Merging with existing analysis data...")
-        existing_df = pd.read_csv(output_path)
+        existing_df = read_table(output_path)
 
         # Update existing rows and add new ones
         existing_df = existing_df[~existing_df['video_id'].isin(df['video_id'])]
@@ -317,8 +368,7 @@ def run_analysis():
         logger.info(f"Combined dataset: {len(df)} total videos")
 
     # Save results
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_csv(output_path, index=False)
+    write_table(df, output_path)
 
     # Count successfully analyzed videos
     num_analyzed = df['summary'].notna().sum()
@@ -2,25 +2,48 @@
 
 import os
 import sys
-import json
 import logging
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from collections import defaultdict, Counter
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.utils.config_loader import load_config
 from src.utils.logger import setup_logger
+from src.utils.json_utils import dump_to_file
+from src.utils.table_io import read_table
+
+
+# Columns consumed by the cross-cluster comparison and their compact dtypes
+ANALYZED_DTYPES = {
+    'cluster': 'category',
+    'sentiment': 'category',
+    'themes': 'string',
+}
+
+# Sentiment labels, in display order
+SENTIMENTS = ['Positive', 'Neutral', 'Negative', 'Mixed']
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
 
 
 def load_analyzed_data(config) -> pd.DataFrame:
-    """Load the analyzed data CSV."""
+    """Load the columns of the analyzed data used for comparison."""
     try:
-        return pd.read_csv(config.paths.analyzed_data)
+        return read_table(
+            config.paths.analyzed_data,
+            columns=list(ANALYZED_DTYPES),
+            dtype=ANALYZED_DTYPES,
+            engine=CSV_ENGINE
+        )
     except FileNotFoundError:
         raise FileNotFoundError(f"Analyzed data not found at {config.paths.analyzed_data}. Run analyze.py first.")
 
@@ -35,31 +58,32 @@ def extract_themes_by_cluster(df: pd.DataFrame) -> Dict[str, List[str]]:
     Returns:
         Dictionary mapping cluster name to list of all themes
     """
-    themes_by_cluster = defaultdict(list)
+    videos = df.loc[df['themes'].notna(), ['cluster', 'themes']]
 
-    for _, row in df.iterrows():
-        if pd.isna(row.get('themes')):
-            continue
+    # Split themes (format: "Theme 1 | Theme 2 | Theme 3") into one row per theme
+    exploded = videos.assign(theme=videos['themes'].astype(str).str.split('|')).explode('theme')
+    themes = exploded['theme'].str.strip()
+    exploded = exploded.assign(theme=themes)[themes != '']
 
-        cluster = row['cluster']
-        # Split themes (format: "Theme 1 | Theme 2 | Theme 3")
-        themes = [t.strip() for t in str(row['themes']).split('|') if t.strip()]
-        themes_by_cluster[cluster].extend(themes)
+    grouped = exploded.groupby('cluster', sort=False, observed=True, dropna=False)['theme'].agg(list).to_dict()
 
-    return dict(themes_by_cluster)
+    # Keep clusters whose videos had only blank themes, in first-appearance order
+    return {cluster: grouped.get(cluster, []) for cluster in videos['cluster'].unique()}
 
 
 def normalize_theme(theme: str) -> str:
     """
     Normalize theme text for comparison (lowercase, strip whitespace).
 
+    The result is interned so repeated themes share a single string object.
+
     Args:
         theme: Theme string
 
     Returns:
         Normalized theme
     """
-    return theme.lower().strip()
+    return sys.intern(theme.lower().strip())
 
 
 def find_shared_themes(themes_by_cluster: Dict[str, List[str]],
@@ -101,19 +125,23 @@ def find_echo_chamber_themes(themes_by_cluster: Dict[str, List[str]]) -> Dict[st
     Returns:
         Dictionary mapping cluster to list of unique themes
     """
+    # Normalize each cluster's themes once and reuse for both passes
+    unique_by_cluster = {
+        cluster: set(normalize_theme(t) for t in themes)
+        for cluster, themes in themes_by_cluster.items()
+    }
+
     # Get all themes and count clusters
     theme_cluster_count = defaultdict(set)
 
-    for cluster, themes in themes_by_cluster.items():
-        unique_themes = set(normalize_theme(t) for t in themes)
+    for cluster, unique_themes in unique_by_cluster.items():
         for theme in unique_themes:
             theme_cluster_count[theme].add(cluster)
 
     # Find themes appearing in only one cluster
     echo_chamber = defaultdict(list)
 
-    for cluster, themes in themes_by_cluster.items():
-        unique_themes = set(normalize_theme(t) for t in themes)
+    for cluster, unique_themes in unique_by_cluster.items():
         for theme in unique_themes:
             if len(theme_cluster_count[theme]) == 1:
                 echo_chamber[cluster].append(theme)
@@ -121,33 +149,69 @@ def find_echo_chamber_themes(themes_by_cluster: Dict[str, List[str]]) -> Dict[st
     return dict(echo_chamber)
 
 
+def _theme_row_pairs(df: pd.DataFrame) -> pd.DataFrame:
+    """Pair each normalized theme with the positions of the rows mentioning it."""
+    themes = pd.Series(df['themes'].to_numpy(), index=np.arange(len(df))).dropna()
+    exploded = themes.astype(str).str.split('|').explode()
+    normalized = exploded.str.lower().str.strip()
+
+    return pd.DataFrame({
+        'theme': normalized.to_numpy(),
+        'row': exploded.index.to_numpy()
+    }).drop_duplicates()
+
+
+def build_theme_index(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Build an inverted index from normalized theme to the rows that mention it.
+
+    Args:
+        df: DataFrame with a 'themes' column
+
+    Returns:
+        Dictionary mapping normalized theme to an array of row positions
+    """
+    pairs = _theme_row_pairs(df)
+    rows = pairs['row'].to_numpy()
+
+    return {
+        theme: rows[positions]
+        for theme, positions in pairs.groupby('theme', sort=False).indices.items()
+    }
+
+
 def calculate_sentiment_divergence(df: pd.DataFrame,
-                                   theme: str) -> Dict[str, Dict[str, float]]:
+                                   theme: str,
+                                   theme_index: Optional[Dict[str, np.ndarray]] = None
+                                   ) -> Dict[str, Dict[str, float]]:
     """
     Calculate sentiment distribution for a theme across clusters.
 
     Args:
         df: DataFrame with analysis results
         theme: Theme to analyze
+        theme_index: Optional index from build_theme_index, reused across themes
 
     Returns:
         Dictionary mapping cluster to sentiment distribution
     """
-    theme_normalized = normalize_theme(theme)
-    divergence = defaultdict(lambda: {'Positive': 0, 'Neutral': 0, 'Negative': 0, 'Mixed': 0})
+    if theme_index is None:
+        theme_index = build_theme_index(df)
 
-    for _, row in df.iterrows():
-        if pd.isna(row.get('themes')) or pd.isna(row.get('sentiment')):
-            continue
+    rows = theme_index.get(normalize_theme(theme))
+    if rows is None:
+        return {}
 
-        # Check if this video discusses the theme
-        themes = [normalize_theme(t.strip()) for t in str(row['themes']).split('|')]
-        if theme_normalized not in themes:
-            continue
+    # Only the videos that discuss the theme are touched
+    videos = df.iloc[rows]
+    videos = videos[videos['sentiment'].notna()]
+    counts = videos.groupby(['cluster', 'sentiment'], sort=False, observed=True).size()
 
-        cluster = row['cluster']
-        sentiment = row['sentiment']
-        divergence[cluster][sentiment] += 1
+    divergence = {}
+    for (cluster, sentiment), count in counts.items():
+        if cluster not in divergence:
+            divergence[cluster] = {'Positive': 0, 'Neutral': 0, 'Negative': 0, 'Mixed': 0}
+        divergence[cluster][sentiment] = int(count)
 
     # Convert counts to percentages
     for cluster in divergence:
@@ -156,7 +220,43 @@ def calculate_sentiment_divergence(df: pd.DataFrame,
             for sentiment in divergence[cluster]:
                 divergence[cluster][sentiment] = (divergence[cluster][sentiment] / total) * 100
 
-    return dict(divergence)
+    return divergence
+
+
+def build_sentiment_table(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calculate the sentiment distribution of every theme across clusters at once.
+
+    Each row matches calculate_sentiment_divergence(df, theme)[cluster].
+
+    Args:
+        df: DataFrame with analysis results
+
+    Returns:
+        DataFrame indexed by (normalized theme, cluster) with sentiment
+        percentages as columns
+    """
+    pairs = _theme_row_pairs(df)
+    rows = pairs['row'].to_numpy()
+
+    videos = pd.DataFrame({
+        'theme': pairs['theme'].to_numpy(),
+        'cluster': df['cluster'].to_numpy()[rows],
+        'sentiment': df['sentiment'].to_numpy()[rows]
+    })
+    videos = videos[videos['sentiment'].notna()]
+
+    counts = videos.groupby(['theme', 'cluster', 'sentiment'], sort=False).size().unstack('sentiment', fill_value=0)
+
+    # Clusters follow their first appearance among each theme's videos
+    order = pd.MultiIndex.from_frame(videos[['theme', 'cluster']].drop_duplicates())
+    counts = counts.reindex(order)
+
+    columns = SENTIMENTS + [c for c in counts.columns if c not in SENTIMENTS]
+    table = counts.reindex(columns=columns, fill_value=0)
+    table.columns.name = None
+
+    return table.div(table.sum(axis=1), axis=0) * 100
 
 
 def calculate_theme_frequency_by_cluster(themes_by_cluster: Dict[str, List[str]]) -> pd.DataFrame:
@@ -191,6 +291,58 @@ def calculate_theme_frequency_by_cluster(themes_by_cluster: Dict[str, List[str]]
     return df_freq
 
 
+def theme_frequency_from_df(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Count normalized themes per cluster straight from the analyzed data.
+
+    Equivalent to calculate_theme_frequency_by_cluster(extract_themes_by_cluster(df))
+    without building per-cluster theme lists. Clusters and themes follow
+    their first appearance, matching build_sparse_theme_matrix.
+
+    Args:
+        df: DataFrame with 'cluster' and 'themes' columns
+
+    Returns:
+        DataFrame with clusters as index and themes as columns
+    """
+    videos = df.loc[df['themes'].notna(), ['cluster', 'themes']]
+    clusters = pd.Index(videos['cluster'].unique(), name='cluster')
+
+    # Group videos by cluster so theme ids follow the per-cluster theme order
+    videos = videos.iloc[np.argsort(pd.factorize(videos['cluster'])[0], kind='stable')]
+    exploded = videos.assign(theme=videos['themes'].astype(str).str.split('|')).explode('theme')
+    themes = exploded['theme'].str.strip()
+    exploded = exploded.assign(theme=themes.str.lower())[themes != '']
+
+    counts = exploded.groupby(['cluster', 'theme'], sort=False, observed=True).size()
+    return (
+        counts.unstack('theme', fill_value=0)
+        .reindex(index=clusters, columns=pd.unique(exploded['theme']), fill_value=0)
+        .rename_axis(columns=None)
+    )
+
+
+def find_echo_chamber_themes_from_frequency(df_freq: pd.DataFrame) -> Dict[str, List[str]]:
+    """
+    Find themes unique to each cluster from a cluster x theme frequency matrix.
+
+    Args:
+        df_freq: Frequency matrix from theme_frequency_from_df
+
+    Returns:
+        Dictionary mapping cluster to list of unique themes
+    """
+    present = df_freq.to_numpy() > 0
+    unique_to_one = present & (present.sum(axis=0) == 1)
+    themes = df_freq.columns.to_numpy()
+
+    return {
+        cluster: themes[row].tolist()
+        for cluster, row in zip(df_freq.index, unique_to_one)
+        if row.any()
+    }
+
+
 def calculate_cluster_similarity(df_freq: pd.DataFrame) -> pd.DataFrame:
     """
     Calculate similarity between clusters based on theme overlap.
@@ -218,41 +370,110 @@ def calculate_cluster_similarity(df_freq: pd.DataFrame) -> pd.DataFrame:
     return df_similarity
 
 
-def identify_consensus_topics(themes_by_cluster: Dict[str, List[str]],
-                             min_clusters: int = 3) -> List[Tuple[str, int, float]]:
+def build_sparse_theme_matrix(themes_by_cluster: Dict[str, List[str]]):
     """
-    Identify consensus topics discussed across multiple clusters.
+    Build a sparse cluster x theme count matrix.
 
     Args:
         themes_by_cluster: Dictionary mapping cluster to list of themes
+
+    Returns:
+        Tuple of (scipy.sparse.csr_matrix, cluster names, normalized theme names)
+    """
+    from scipy.sparse import csr_matrix
+
+    clusters = list(themes_by_cluster.keys())
+    normalized = [normalize_theme(t) for themes in themes_by_cluster.values() for t in themes]
+    # Theme ids follow first-appearance order
+    theme_codes, theme_names = pd.factorize(pd.Series(normalized, dtype=object))
+
+    cluster_ids = np.repeat(
+        np.arange(len(clusters)),
+        [len(themes) for themes in themes_by_cluster.values()]
+    )
+
+    # Duplicate (cluster, theme) entries are summed into counts
+    matrix = csr_matrix(
+        (np.ones(len(normalized)), (cluster_ids, theme_codes)),
+        shape=(len(clusters), len(theme_names))
+    )
+
+    return matrix, clusters, list(theme_names)
+
+
+def sparse_theme_matrix_from_frequency(df_freq: pd.DataFrame):
+    """
+    Convert a cluster x theme frequency matrix to build_sparse_theme_matrix's form.
+
+    Args:
+        df_freq: Frequency matrix from theme_frequency_from_df
+
+    Returns:
+        Tuple of (scipy.sparse.csr_matrix, cluster names, normalized theme names)
+    """
+    from scipy.sparse import csr_matrix
+
+    return csr_matrix(df_freq.to_numpy(dtype=float)), list(df_freq.index), list(df_freq.columns)
+
+
+def calculate_cluster_similarity_from_themes(themes_by_cluster: Optional[Dict[str, List[str]]],
+                                            theme_matrix: Optional[tuple] = None) -> pd.DataFrame:
+    """
+    Calculate cosine similarity between clusters without a dense frequency matrix.
+
+    Args:
+        themes_by_cluster: Dictionary mapping cluster to list of themes (unused
+            when theme_matrix is given)
+        theme_matrix: Optional result of build_sparse_theme_matrix to reuse
+
+    Returns:
+        Similarity matrix as DataFrame
+    """
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    matrix, clusters, _ = theme_matrix or build_sparse_theme_matrix(themes_by_cluster)
+
+    # Sparse input stays sparse until the small (C x C) output
+    similarity_matrix = cosine_similarity(matrix)
+
+    index = pd.Index(clusters, name='cluster')
+    return pd.DataFrame(similarity_matrix, index=index, columns=index)
+
+
+def identify_consensus_topics(themes_by_cluster: Optional[Dict[str, List[str]]],
+                             min_clusters: int = 3,
+                             theme_matrix: Optional[tuple] = None) -> List[Tuple[str, int, float]]:
+    """
+    Identify consensus topics discussed across multiple clusters.
+
+    Args:
+        themes_by_cluster: Dictionary mapping cluster to list of themes (unused
+            when theme_matrix is given)
         min_clusters: Minimum number of clusters for consensus
+        theme_matrix: Optional result of build_sparse_theme_matrix to reuse
 
     Returns:
         List of (theme, num_clusters, avg_frequency) tuples, sorted by coverage
     """
-    # Count cluster coverage and frequency for each theme
-    theme_stats = defaultdict(lambda: {'clusters': set(), 'total_count': 0})
-
-    for cluster, themes in themes_by_cluster.items():
-        normalized_themes = [normalize_theme(t) for t in themes]
-        theme_counts = Counter(normalized_themes)
+    matrix, _, themes = theme_matrix or build_sparse_theme_matrix(themes_by_cluster)
+    if not themes:
+        return []
 
-        for theme, count in theme_counts.items():
-            theme_stats[theme]['clusters'].add(cluster)
-            theme_stats[theme]['total_count'] += count
+    # Per-theme cluster coverage and total mentions as flat arrays
+    cluster_counts = np.asarray((matrix > 0).sum(axis=0)).ravel()
+    total_counts = np.asarray(matrix.sum(axis=0)).ravel()
 
-    # Filter and format consensus topics
-    consensus = []
-    for theme, stats in theme_stats.items():
-        num_clusters = len(stats['clusters'])
-        if num_clusters >= min_clusters:
-            avg_freq = stats['total_count'] / num_clusters
-            consensus.append((theme, num_clusters, avg_freq))
+    selected = np.flatnonzero(cluster_counts >= min_clusters)
+    num_clusters = cluster_counts[selected]
+    avg_freq = total_counts[selected] / num_clusters
 
-    # Sort by number of clusters, then by frequency
-    consensus.sort(key=lambda x: (x[1], x[2]), reverse=True)
+    # Stable sort by number of clusters, then by frequency (both descending)
+    order = np.lexsort((-avg_freq, -num_clusters))
 
-    return consensus
+    return [
+        (themes[selected[i]], int(num_clusters[i]), float(avg_freq[i]))
+        for i in order
+    ]
 
 
 def generate_comparison_report(df: pd.DataFrame) -> Dict:
@@ -272,15 +493,20 @@ def generate_comparison_report(df: pd.DataFrame) -> Dict:
 
     logger.info(f"Analyzing {len(themes_by_cluster)} clusters")
 
+    # One sparse cluster x theme matrix feeds consensus and similarity
+    theme_matrix = build_sparse_theme_matrix(themes_by_cluster)
+
     # Calculate metrics
     shared_themes = find_shared_themes(themes_by_cluster, min_clusters=2)
     echo_chamber = find_echo_chamber_themes(themes_by_cluster)
-    consensus_topics = identify_consensus_topics(themes_by_cluster, min_clusters=3)
+    consensus_topics = identify_consensus_topics(themes_by_cluster, min_clusters=3,
+                                                 theme_matrix=theme_matrix)
     freq_matrix = calculate_theme_frequency_by_cluster(themes_by_cluster)
 
     # Calculate similarity only if we have sklearn
     try:
-        similarity_matrix = calculate_cluster_similarity(freq_matrix)
+        similarity_matrix = calculate_cluster_similarity_from_themes(themes_by_cluster,
+                                                                    theme_matrix=theme_matrix)
         similarity_data = similarity_matrix.to_dict()
     except ImportError:
         logger.warning("scikit-learn not installed. Skipping similarity matrix.")
@@ -288,8 +514,9 @@ def generate_comparison_report(df: pd.DataFrame) -> Dict:
 
     # Get sentiment divergence for top consensus topics
     sentiment_divergence = {}
+    theme_index = build_theme_index(df)
     for theme, num_clusters, avg_freq in consensus_topics[:5]:
-        sentiment_divergence[theme] = calculate_sentiment_divergence(df, theme)
+        sentiment_divergence[theme] = calculate_sentiment_divergence(df, theme, theme_index)
 
     # Compile report
     report = {
@@ -360,8 +587,7 @@ if __name__ == "__main__":
 
     # Save report
     report_path = Path("data/cross_cluster_report.json")
-    with open(report_path, 'w') as f:
-        json.dump(report, f, indent=2)
+    dump_to_file(report, report_path)
     logger.info(f"\n💾 Full report saved to {report_path}")
 
     logger.info("="*60)
@@ -3,10 +3,18 @@ import sys
 import time
 import argparse
 import logging
+import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Reports are only written to disk
 import matplotlib.pyplot as plt
+from matplotlib.collections import PolyCollection
 import seaborn as sns
 from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import httplib2
+import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 from dotenv import load_dotenv
 from googleapiclient.discovery import build
@@ -17,49 +25,106 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.utils.config_loader import load_config
 from src.utils.logger import setup_logger, QuotaTracker
 from src.utils.cache_manager import CacheManager
+from src.utils.figure_io import save_figure
 from src.utils.rate_limiter import YouTubeAPIRateLimiter, TranscriptRateLimiter
 from src.analyze import get_transcript
 from src.ingest import ingest_clusters
 from src.visualizations.word_clouds import generate_word_cloud
 
-def fetch_video_stats(video_ids, api_key, logger, quota_tracker, config):
+# View counts fetched within this window are served from the cache
+VIDEO_STATS_TTL_SECONDS = 3600
+
+# Minimum number and share of videos ranked before the cumulative view cutoff
+TOP_VIEWS_MIN_K = 100
+TOP_VIEWS_FRACTION = 0.2
+
+def fetch_video_stats(video_ids, api_key, logger, quota_tracker, config, youtube=None, cache_manager=None):
     """Fetches view counts for a list of video IDs in batches of 50."""
-    youtube = build('youtube', 'v3', developerKey=api_key)
+    cached_stats = {}
+    if cache_manager is not None:
+        cached_stats = cache_manager.get_video_stats(video_ids, ttl_seconds=VIDEO_STATS_TTL_SECONDS)
+        video_ids = [vid for vid in video_ids if vid not in cached_stats]
+        logger.info(f"View counts: {len(cached_stats)} cached, {len(video_ids)} to fetch")
+        if not video_ids:
+            return cached_stats
+
+    if youtube is None:
+        youtube = build('youtube', 'v3', developerKey=api_key)
     rate_limiter = YouTubeAPIRateLimiter(config, quota_tracker, logger)
     stats_map = {}
 
-    # Process in chunks of 50
+    # Chunks of the current batch that have not succeeded yet, by request id
+    pending = {}
+    errors = []
+
+    def _collect_stats(request_id, response, exception):
+        if exception is not None:
+            errors.append(exception)
+            return
+        del pending[request_id]
+        for item in response.get('items', []):
+            vid = item['id']
+            views = int(item['statistics'].get('viewCount', 0))
+            stats_map[vid] = views
+
+    # 50 IDs per videos.list call, up to 50 calls multiplexed per batch HTTP request
     chunk_size = 50
-    for i in range(0, len(video_ids), chunk_size):
-        chunk = video_ids[i:i+chunk_size]
-        try:
-            @rate_limiter.rate_limit_youtube_api
-            def _fetch_batch():
-                quota_tracker.log_youtube_api_call(1, f"get stats for {len(chunk)} videos")
-                response = youtube.videos().list(
-                    part="statistics",
-                    id=",".join(chunk)
-                ).execute()
-                return response
-
-            response = _fetch_batch()
-
-            for item in response.get('items', []):
-                vid = item['id']
-                views = int(item['statistics'].get('viewCount', 0))
-                stats_map[vid] = views
+    chunks = [video_ids[i:i+chunk_size] for i in range(0, len(video_ids), chunk_size)]
+    requests_per_batch = 50
+
+    @rate_limiter.rate_limit_youtube_api
+    def _fetch_batch():
+        # Only chunks that failed on a previous attempt are requested again
+        batch = youtube.new_batch_http_request(callback=_collect_stats)
+        for request_id, chunk in pending.items():
+            batch.add(youtube.videos().list(part="statistics", id=",".join(chunk)),
+                      request_id=request_id)
+
+        # Each sub-request is billed separately (1 unit each)
+        quota_tracker.log_youtube_api_call(
+            len(pending),
+            f"get stats for {sum(len(c) for c in pending.values())} videos"
+        )
+        errors.clear()
+        batch.execute()
 
+        # Sub-request errors only reach the callback; raise one so the
+        # retry and quota handling of the rate limiter see it
+        if errors:
+            raise next((e for e in errors if rate_limiter.is_retryable(e)), errors[0])
+
+    for i in range(0, len(chunks), requests_per_batch):
+        pending.clear()
+        pending.update((str(j), chunk) for j, chunk in enumerate(chunks[i:i+requests_per_batch]))
+
+        try:
+            _fetch_batch()
         except Exception as e:
-            logger.error(f"Error fetching stats for chunk: {e}")
+            failed = sum(len(chunk) for chunk in pending.values())
+            logger.error(f"Error fetching stats for batch, {failed} videos have no view count: {e}")
 
         # Add delay between batches to prevent rate limiting
-        if i + chunk_size < len(video_ids):
+        if i + requests_per_batch < len(chunks):
             delay = config.rate_limiting.batch_operations.delay_between_batches
             logger.debug(f"Batch delay: {delay}s before next batch")
             time.sleep(delay)
 
+    if cache_manager is not None:
+        cache_manager.save_video_stats(stats_map, ttl_seconds=VIDEO_STATS_TTL_SECONDS)
+        stats_map.update(cached_stats)
+
     return stats_map
 
+def rank_by_views(views, k=None):
+    """Returns positions of the k most viewed videos, most viewed first."""
+    n = len(views)
+    if k is None or k >= n:
+        return np.argsort(-views, kind='stable')
+
+    # Partial sort: select the top k in linear time, then order only those
+    top = np.argpartition(-views, k - 1)[:k]
+    return top[np.argsort(-views[top], kind='stable')]
+
 def plot_views_by_cluster(df, report_dir, target_date_iso):
     """Plots total views per channel as a stacked bar of individual videos."""
     
@@ -71,59 +136,71 @@ def plot_views_by_cluster(df, report_dir, target_date_iso):
         'my-env': 'Greens_r'
     }
     
-    for cluster in df['cluster'].unique():
-        cluster_df = df[df['cluster'] == cluster].copy()
-        
-        # Sort channels by TOTAL views (Ascending for barh so largest is at top)
-        channel_totals = cluster_df.groupby('channel_name')['view_count'].sum().sort_values(ascending=True)
-        if channel_totals.empty:
-            continue
-            
-        channels = channel_totals.index.tolist()
-        
-        # Dynamic height
-        plt.figure(figsize=(12, max(4, len(channels) * 0.6 + 1.5)))
-        
-        # Get base color from palette (using a mid-dark shade)
-        palette_name = cluster_palettes.get(cluster, 'viridis')
-        try:
-            # Try to get a nice color from seaborn
-            colors = sns.color_palette(palette_name, n_colors=10)
-            base_color = colors[4] # Mid-range color
-        except:
-            base_color = 'steelblue'
-
-        # Plot each channel
-        for i, channel in enumerate(channels):
-            # Get videos for this channel, sorted by size
-            videos = cluster_df[cluster_df['channel_name'] == channel].sort_values('view_count', ascending=False)
+    # One segment per video: channels stacked largest video first. Videos
+    # without a channel have no bar, so they are dropped up front.
+    videos = df[df['channel_name'].notna()].sort_values(
+        ['cluster', 'channel_name', 'view_count'], ascending=[True, True, False]
+    )
+    channel_groups = videos.groupby(['cluster', 'channel_name'], sort=False)['view_count']
+    videos = videos.assign(left=channel_groups.cumsum() - videos['view_count'])
+    totals = channel_groups.sum()
+    
+    # One figure is reused for every cluster and cleared between plots
+    fig = plt.figure()
+    try:
+        for cluster, cluster_videos in videos.groupby('cluster', sort=False):
+            # Sort channels by TOTAL views (Ascending for barh so largest is at top)
+            channel_totals = totals.loc[cluster].sort_values(ascending=True, kind='stable')
+            channels = channel_totals.index.tolist()
             
-            left_offset = 0
-            for _, video in videos.iterrows():
-                views = video['view_count']
-                # Plot segment with white border to show it's a separate video
-                plt.barh(i, views, left=left_offset, color=base_color, edgecolor='white', linewidth=1.5)
-                left_offset += views
+            # Dynamic height
+            fig.clf()
+            fig.set_size_inches(12, max(4, len(channels) * 0.6 + 1.5))
+            ax = fig.add_subplot()
             
-            # Label the total
-            plt.text(left_offset, i, f" {int(left_offset):,.0f}", va='center', fontweight='bold', fontsize=10)
+            # Get base color from palette (using a mid-dark shade)
+            palette_name = cluster_palettes.get(cluster, 'viridis')
+            try:
+                # Try to get a nice color from seaborn
+                colors = sns.color_palette(palette_name, n_colors=10)
+                base_color = colors[4] # Mid-range color
+            except:
+                base_color = 'steelblue'
 
-        plt.title(f"Views by Channel: {cluster.title()} ({target_date_iso})", fontsize=16)
-        plt.xlabel("Total Views (Segments = Individual Videos)", fontsize=12)
-        plt.yticks(range(len(channels)), channels, fontsize=11)
-        
-        # Adjust x-axis limits to fit labels
-        plt.xlim(right=channel_totals.max() * 1.3)
-        plt.tight_layout()
-        
-        save_path = os.path.join(report_dir, f"views_by_channel_{cluster}.png")
-        plt.savefig(save_path, bbox_inches='tight')
-        plt.close()
+            widths = cluster_videos['view_count'].to_numpy(dtype=float)
+            lefts = cluster_videos['left'].to_numpy(dtype=float)
+            y_index = cluster_videos['channel_name'].map({channel: i for i, channel in enumerate(channels)}).to_numpy()
+
+            # Draw every segment as a single collection (white borders separate videos)
+            half_height = 0.4
+            verts = np.empty((len(widths), 4, 2))
+            verts[:, [0, 1], 0] = lefts[:, None]
+            verts[:, [2, 3], 0] = (lefts + widths)[:, None]
+            verts[:, [0, 3], 1] = (y_index - half_height)[:, None]
+            verts[:, [1, 2], 1] = (y_index + half_height)[:, None]
+            ax.add_collection(PolyCollection(verts, facecolors=[base_color], edgecolors='white', linewidths=1.5))
+            ax.autoscale_view()
+
+            # Label the totals
+            for i, total in enumerate(channel_totals.to_numpy()):
+                ax.text(total, i, f" {int(total):,.0f}", va='center', fontweight='bold', fontsize=10)
+
+            ax.set_title(f"Views by Channel: {cluster.title()} ({target_date_iso})", fontsize=16)
+            ax.set_xlabel("Total Views (Segments = Individual Videos)", fontsize=12)
+            ax.set_yticks(range(len(channels)), channels, fontsize=11)
+            
+            # Adjust x-axis limits to fit labels
+            ax.set_xlim(left=0, right=channel_totals.max() * 1.3)
+            fig.tight_layout()
+            
+            save_path = os.path.join(report_dir, f"views_by_channel_{cluster}.png")
+            save_figure(fig, save_path, bbox_inches='tight')
+    finally:
+        plt.close(fig)
 
 def run_daily_report(target_date_str=None):
     # 1. Setup & Configuration
     load_dotenv()
-    load_config() 
     config = load_config()
     
     if target_date_str:
@@ -149,17 +226,24 @@ def run_daily_report(target_date_str=None):
         logger.error("No API Key found.")
         return
 
+    # One keep-alive HTTP connection for every YouTube Data API call in the report
+    http = httplib2.Http(timeout=30)
+    youtube = build('youtube', 'v3', developerKey=API_KEY, http=http)
+
     # Ingest metadata
     logger.info("Step 1: Ingesting recent videos...")
-    df_all = ingest_clusters(clusters_config, API_KEY, config, logger, quota_tracker, incremental=False)
+    df_all = ingest_clusters(clusters_config, API_KEY, config, logger, quota_tracker, incremental=False, youtube=youtube)
     
     if df_all.empty:
         logger.warning("No videos found.")
         return
 
     # Filter for Target Date
-    df_all['publish_dt'] = pd.to_datetime(df_all['publish_date']).dt.date
-    daily_df = df_all[df_all['publish_dt'] == target_date].copy()
+    # Keep timestamps as datetime64 and select the UTC day as a range
+    df_all['publish_dt'] = pd.to_datetime(df_all['publish_date'], utc=True, cache=True)
+    day_start = pd.Timestamp(target_date, tz='UTC')
+    day_end = day_start + pd.Timedelta(days=1)
+    daily_df = df_all[(df_all['publish_dt'] >= day_start) & (df_all['publish_dt'] < day_end)].copy()
     
     count = len(daily_df)
     if count == 0:
@@ -171,29 +255,42 @@ def run_daily_report(target_date_str=None):
     # 3. Fetch View Counts & Filter
     logger.info("Step 2: Fetching view counts to identify top content...")
     video_ids = daily_df['video_id'].unique().tolist()
-    stats = fetch_video_stats(video_ids, API_KEY, logger, quota_tracker, config)
-    
-    # Map views to dataframe
-    daily_df['view_count'] = daily_df['video_id'].map(stats).fillna(0).astype(int)
+    cache_manager = CacheManager(config.analysis.cache_dir, logger)
+    stats = fetch_video_stats(video_ids, API_KEY, logger, quota_tracker, config,
+                              youtube=youtube, cache_manager=cache_manager)
     
-    # Sort by views descending
-    daily_df = daily_df.sort_values('view_count', ascending=False)
+    # Join views onto the dataframe through an indexed Series (hash join)
+    view_counts = pd.Series(stats, name='view_count', dtype='int64')
+    daily_df = daily_df.join(view_counts, on='video_id')
+    missing_views = daily_df['view_count'].isna().sum()
+    if missing_views:
+        logger.warning(f"{missing_views} videos have no view count and are ranked as 0 views")
+    daily_df['view_count'] = daily_df['view_count'].fillna(0).astype('int64')
     
-    # Calculate Cumulative Views
-    total_views = daily_df['view_count'].sum()
-    daily_df['cumulative_views'] = daily_df['view_count'].cumsum()
-    daily_df['cumulative_percent'] = daily_df['cumulative_views'] / total_views
+    # Rank only the most viewed videos instead of sorting the whole day
+    views = daily_df['view_count'].to_numpy()
+    total_views = views.sum()
+    k = max(TOP_VIEWS_MIN_K, int(len(views) * TOP_VIEWS_FRACTION))
+    order = rank_by_views(views, k)
     
-    # Filter: Keep videos that contribute to the top 67% (2/3) of views
-    cutoff_mask = daily_df['cumulative_percent'] <= 0.67
+    # Filter: Keep videos that contribute to the top 67% (2/3) of views.
+    # The cumulative share is non-decreasing in ranked order, so a binary
+    # search finds the cutoff.
+    cutoff = 0
+    if total_views > 0:
+        cumulative_percent = np.cumsum(views[order]) / total_views
+        cutoff = int(np.searchsorted(cumulative_percent, 0.67, side='right'))
+        if cutoff == len(order) and len(order) < len(views):
+            # The ranked prefix did not reach the cutoff; rank everything
+            order = rank_by_views(views)
+            cumulative_percent = np.cumsum(views[order]) / total_views
+            cutoff = int(np.searchsorted(cumulative_percent, 0.67, side='right'))
     
-    if not cutoff_mask.any():
+    if cutoff == 0:
          # Fallback if just one video dominates > 67%
-         filtered_df = daily_df.iloc[:5]
+         filtered_df = daily_df.iloc[order[:5]]
     else:
-        last_idx = cutoff_mask[cutoff_mask].index[-1]
-        loc = daily_df.index.get_loc(last_idx)
-        filtered_df = daily_df.iloc[:loc+1]
+        filtered_df = daily_df.iloc[order[:cutoff]]
 
     # SAFETY NET: Ensure EVERY cluster is represented
     # If a cluster is missing from the top set (because another cluster dominated views),
@@ -207,7 +304,7 @@ def run_daily_report(target_date_str=None):
         extras = []
         for cluster in missing_clusters:
             # Get top 5 for this cluster
-            top_cluster_vids = daily_df[daily_df['cluster'] == cluster].head(5)
+            top_cluster_vids = daily_df[daily_df['cluster'] == cluster].nlargest(5, 'view_count')
             extras.append(top_cluster_vids)
         
         if extras:
@@ -227,34 +324,43 @@ def run_daily_report(target_date_str=None):
     
     # 4. Fetch Transcripts for Filtered Videos
     logger.info("Step 3: Fetching transcripts for top videos...")
-    cache_manager = CacheManager(config.analysis.cache_dir, logger)
     transcript_rate_limiter = TranscriptRateLimiter(config, logger)
 
     cluster_texts = {}
-    combined_text = []
     
     # Identify all unique clusters in the filtered set
     target_clusters = filtered_df['cluster'].unique()
     logger.info(f"Generating reports for clusters: {target_clusters}")
+
+    # Fetch all transcripts concurrently; the rate limiter still spaces real requests
+    video_ids = filtered_df['video_id'].unique().tolist()
+    max_workers = config.rate_limiting.batch_operations.max_parallel_workers
+
+    # Shared connection pool for transcript fetches across worker threads
+    transcript_session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+    transcript_session.mount("https://", adapter)
+    transcript_session.mount("http://", adapter)
+
+    transcripts = {}
+    with transcript_session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_to_vid = {
+            executor.submit(get_transcript, vid, cache_manager, logger, transcript_rate_limiter, transcript_session): vid
+            for vid in video_ids
+        }
+        for future in tqdm(as_completed(future_to_vid), total=len(future_to_vid), leave=False):
+            transcripts[future_to_vid[future]] = future.result()
     
     for cluster in target_clusters:
         cluster_videos = filtered_df[filtered_df['cluster'] == cluster]
-        cluster_transcripts = []
         
         logger.info(f"  Processing cluster '{cluster}' ({len(cluster_videos)} top videos)...")
         
-        for _, row in tqdm(cluster_videos.iterrows(), total=len(cluster_videos), leave=False):
-            vid = row['video_id']
-            title = row['title']
-            text = get_transcript(vid, cache_manager, logger, transcript_rate_limiter)
-            
-            if text:
-                cluster_transcripts.append(text)
-                combined_text.append(text)
-            else:
-                # Fallback to title if transcript is unavailable (e.g. IP blocked)
-                cluster_transcripts.append(title)
-                combined_text.append(title)
+        # Fallback to title if transcript is unavailable (e.g. IP blocked)
+        cluster_transcripts = [
+            transcripts.get(vid) or title
+            for vid, title in cluster_videos[['video_id', 'title']].itertuples(index=False, name=None)
+        ]
         
         full_text = " ".join(cluster_transcripts)
         cluster_texts[cluster] = full_text
@@ -287,8 +393,9 @@ def run_daily_report(target_date_str=None):
         'my-env': 'viridis'
     }
     
-    # Combined Cloud
-    full_text = " ".join(combined_text)
+    # Combined Cloud (every cluster holds at least one video, so joining the
+    # per-cluster texts matches joining all individual transcripts)
+    full_text = " ".join(cluster_texts.values())
     if full_text.strip():
         wc_module.generate_word_cloud(
             full_text,
@@ -1,10 +1,12 @@
 import os
 import sys
 import json
+import time
 import logging
 import pandas as pd
 from datetime import datetime, timezone
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from dotenv import load_dotenv
 
 # Add parent directory to path for imports
@@ -13,7 +15,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.utils.config_loader import load_config, get_project_root
 from src.utils.logger import setup_logger, QuotaTracker, QuotaExceededException
 from src.utils.metadata_manager import MetadataManager
+from src.utils.json_utils import load_from_file
 from src.utils.rate_limiter import YouTubeAPIRateLimiter
+from src.utils.table_io import TableWriter, read_table, write_table, append_table, table_exists
 from src.temporal_analysis import save_historical_snapshot
 
 # --- Helper Functions ---
@@ -21,8 +25,7 @@ from src.temporal_analysis import save_historical_snapshot
 def load_channel_id_cache(cache_path):
     """Loads the stored Channel ID cache from the data directory."""
     if os.path.exists(cache_path):
-        with open(cache_path, 'r') as f:
-            return json.load(f)
+        return load_from_file(cache_path)
     return {}
 
 def save_channel_id_cache(cache, cache_path):
@@ -34,8 +37,7 @@ def save_channel_id_cache(cache, cache_path):
 def load_playlist_id_cache(cache_path):
     """Loads the stored Playlist ID cache."""
     if os.path.exists(cache_path):
-        with open(cache_path, 'r') as f:
-            return json.load(f)
+        return load_from_file(cache_path)
     return {}
 
 def save_playlist_id_cache(cache, cache_path):
@@ -44,6 +46,18 @@ def save_playlist_id_cache(cache, cache_path):
     with open(cache_path, 'w') as f:
         json.dump(cache, f, indent=4)
 
+def load_playlist_items_cache(cache_path):
+    """Loads the stored playlist responses, keyed by playlist and page size."""
+    if os.path.exists(cache_path):
+        return load_from_file(cache_path)
+    return {}
+
+def save_playlist_items_cache(cache, cache_path):
+    """Saves the updated playlist responses."""
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, 'w') as f:
+        json.dump(cache, f)
+
 def resolve_channel_id(youtube, handle, cache, logger, quota_tracker, rate_limiter):
     """Checks cache first, then resolves handle to Channel ID using search API (100 units)."""
     if handle in cache:
@@ -73,8 +87,14 @@ def resolve_channel_id(youtube, handle, cache, logger, quota_tracker, rate_limit
         logger.error(f"Error resolving handle {handle}: {e}")
         return None
 
-def get_recent_videos(youtube, channel_id, channel_name, limit, logger, quota_tracker, rate_limiter, playlist_cache=None):
-    """Fetches the most recent X videos from a specific channel ID."""
+def get_recent_videos(youtube, channel_id, channel_name, limit, logger, quota_tracker, rate_limiter, playlist_cache=None,
+                      items_cache=None, force_refresh=False):
+    """Fetches the most recent X videos from a specific channel ID.
+
+    If items_cache is given, the playlist request is sent with the ETag of
+    the cached response, and the cached videos are reused when YouTube
+    answers 304 Not Modified. force_refresh skips the revalidation.
+    """
     videos = []
 
     try:
@@ -98,17 +118,33 @@ def get_recent_videos(youtube, channel_id, channel_name, limit, logger, quota_tr
             logger.debug(f"     [CACHE HIT] Using cached uploads playlist for {channel_name}")
 
         # 2. Get videos from that playlist (1 unit, up to 50 results)
+        cache_key = f"{playlist_id}:{limit}"
+        cached = items_cache.get(cache_key) if items_cache is not None and not force_refresh else None
+
         @rate_limiter.rate_limit_youtube_api
         def _get_playlist_items():
-            res = youtube.playlistItems().list(
+            request = youtube.playlistItems().list(
                 playlistId=playlist_id,
                 part='snippet',
                 maxResults=limit
-            ).execute()
+            )
+            if cached:
+                request.headers['If-None-Match'] = cached['etag']
+            try:
+                res = request.execute()
+            except HttpError as e:
+                if not cached or e.resp.status != 304:
+                    raise
+                res = None
             quota_tracker.log_youtube_api_call(1, f"get {limit} videos from {channel_name}")
             return res
 
         res = _get_playlist_items()
+        if res is None:
+            logger.debug(f"     [CACHE HIT] Playlist unchanged for {channel_name}")
+            res = {'items': cached['items']}
+        elif items_cache is not None and res.get('etag'):
+            items_cache[cache_key] = {'etag': res['etag'], 'items': res['items'], 'fetched_at': time.time()}
 
         for item in res['items']:
             if item['snippet']['title'] in ["Private video", "Deleted video"]:
@@ -127,17 +163,56 @@ def get_recent_videos(youtube, channel_id, channel_name, limit, logger, quota_tr
         logger.error(f"Error fetching videos for {channel_name}: {e}")
         return []
 
+# channels.list accepts up to 50 comma-separated IDs per request
+CHANNELS_PER_REQUEST = 50
+
+def prefetch_uploads_playlists(youtube, channel_ids, playlist_cache, logger, quota_tracker, rate_limiter):
+    """Fetches the uploads playlists of uncached channels, 50 channels per call (1 unit each)."""
+    missing = list(dict.fromkeys(cid for cid in channel_ids if cid not in playlist_cache))
+
+    for start in range(0, len(missing), CHANNELS_PER_REQUEST):
+        chunk = missing[start:start + CHANNELS_PER_REQUEST]
+        logger.info(f"     [CACHE MISS] Fetching uploads playlists for {len(chunk)} channels (1 unit)...")
+
+        @rate_limiter.rate_limit_youtube_api
+        def _get_uploads_playlists():
+            res = youtube.channels().list(
+                id=','.join(chunk),
+                part='contentDetails',
+                maxResults=CHANNELS_PER_REQUEST
+            ).execute()
+            quota_tracker.log_youtube_api_call(1, f"get uploads playlists for {len(chunk)} channels")
+            return res
+
+        try:
+            res = _get_uploads_playlists()
+        except QuotaExceededException:
+            raise
+        except Exception as e:
+            # get_recent_videos looks up the remaining channels one at a time
+            logger.error(f"Error fetching uploads playlists: {e}")
+            continue
+
+        for item in res.get('items', []):
+            playlist_cache[item['id']] = item['contentDetails']['relatedPlaylists']['uploads']
+
 # --- Main Ingestion Logic ---
 
-def ingest_clusters(clusters_config, api_key, config, logger, quota_tracker, incremental=False, metadata_mgr=None):
-    """Main function to process clusters and fetch video metadata."""
+def iter_cluster_batches(clusters_config, api_key, config, logger, quota_tracker, incremental=False, metadata_mgr=None,
+                         youtube=None, force_refresh=False):
+    """Fetches video metadata cluster by cluster, yielding a DataFrame of each cluster's videos.
+
+    An existing YouTube client can be passed in to share its HTTP connection.
+    force_refresh re-downloads playlists instead of revalidating cached
+    responses by ETag.
+    """
     if not api_key:
         logger.error("YOUTUBE_API_KEY not found. Please check your .env file.")
-        return pd.DataFrame()
+        return
 
-    youtube = build('youtube', 'v3', developerKey=api_key)
+    if youtube is None:
+        youtube = build('youtube', 'v3', developerKey=api_key)
     rate_limiter = YouTubeAPIRateLimiter(config, quota_tracker, logger)
-    all_videos = []
 
     # Load cache using config path
     cache_path = config.ingest.channel_id_cache_path
@@ -146,6 +221,9 @@ def ingest_clusters(clusters_config, api_key, config, logger, quota_tracker, inc
     playlist_cache_path = config.ingest.playlist_id_cache_path
     playlist_cache = load_playlist_id_cache(playlist_cache_path)
 
+    items_cache_path = config.ingest.playlist_items_cache_path
+    items_cache = load_playlist_items_cache(items_cache_path)
+
     # Check for incremental mode
     last_run = None
     if incremental and metadata_mgr:
@@ -159,31 +237,46 @@ def ingest_clusters(clusters_config, api_key, config, logger, quota_tracker, inc
     logger.info(f"Starting Quota-Optimized Ingestion for {len(clusters_config)} clusters...")
 
     try:
+        # 1. Resolve Handles to IDs (Cached call)
+        channel_ids = {}
+        for handles in clusters_config.values():
+            for handle in handles:
+                if handle not in channel_ids:
+                    channel_ids[handle] = resolve_channel_id(youtube, handle, channel_id_cache, logger, quota_tracker, rate_limiter)
+
+        # 2. Look up uploads playlists for all channels in as few calls as possible
+        prefetch_uploads_playlists(youtube, [cid for cid in channel_ids.values() if cid],
+                                   playlist_cache, logger, quota_tracker, rate_limiter)
+
         for cluster_name, handles in clusters_config.items():
             logger.info(f"Processing Cluster: {cluster_name}")
+            cluster_videos = []
 
             for handle in handles:
                 logger.info(f"  -> Fetching data for: {handle}")
 
-                # 1. Resolve Handle to ID (Cached call)
-                cid = resolve_channel_id(youtube, handle, channel_id_cache, logger, quota_tracker, rate_limiter)
+                cid = channel_ids[handle]
                 if not cid:
                     continue
 
-                # 2. Fetch Videos (Cheap calls: 2 units per channel)
-                videos = get_recent_videos(youtube, cid, handle, config.ingest.videos_per_channel, logger, quota_tracker, rate_limiter, playlist_cache=playlist_cache)
+                # 3. Fetch Videos (1 unit per channel)
+                videos = get_recent_videos(youtube, cid, handle, config.ingest.videos_per_channel, logger, quota_tracker, rate_limiter,
+                                           playlist_cache=playlist_cache, items_cache=items_cache, force_refresh=force_refresh)
 
-                # 3. Filter to new videos only if incremental
+                # 4. Filter to new videos only if incremental
                 if incremental and last_run:
                     original_count = len(videos)
                     videos = [v for v in videos if v['publish_date'] > last_run]
                     if len(videos) < original_count:
                         logger.info(f"     Filtered to {len(videos)} new videos (was {original_count})")
 
-                # 4. Tag with Cluster Name and append
+                # 5. Tag with Cluster Name and append
                 for v in videos:
                     v['cluster'] = cluster_name
-                    all_videos.append(v)
+                cluster_videos.extend(videos)
+
+            if cluster_videos:
+                yield pd.DataFrame(cluster_videos)
     except QuotaExceededException:
         logger.warning("Quota exceeded! Returning partial results.")
     finally:
@@ -191,9 +284,90 @@ def ingest_clusters(clusters_config, api_key, config, logger, quota_tracker, inc
         if config.ingest.cache_channel_ids:
             save_channel_id_cache(channel_id_cache, cache_path)
             save_playlist_id_cache(playlist_cache, playlist_cache_path)
-
-    df = pd.DataFrame(all_videos)
-    return df
+            save_playlist_items_cache(items_cache, items_cache_path)
+
+def ingest_clusters(clusters_config, api_key, config, logger, quota_tracker, incremental=False, metadata_mgr=None, youtube=None,
+                    on_batch=None, force_refresh=False):
+    """Main function to process clusters and fetch video metadata.
+
+    Collects the batches of iter_cluster_batches into one DataFrame. If
+    on_batch is given, it is called with each cluster's videos as soon as
+    that cluster is fetched.
+    """
+    batches = []
+    for batch in iter_cluster_batches(clusters_config, api_key, config, logger, quota_tracker, incremental=incremental,
+                                      metadata_mgr=metadata_mgr, youtube=youtube, force_refresh=force_refresh):
+        batches.append(batch)
+        if on_batch:
+            on_batch(batch)
+
+    if not batches:
+        return pd.DataFrame()
+    return pd.concat(batches, ignore_index=True)
+
+def save_cluster_data(df, output_path, incremental, logger):
+    """Save ingested videos and return the number of videos stored.
+
+    In incremental mode only the video_id column of the existing data is
+    read, and videos not already stored are appended to it. Videos that
+    were ingested before keep their original rows.
+    """
+    df = df.drop_duplicates(subset=['video_id'], keep='last')
+
+    if not (incremental and table_exists(output_path)):
+        write_table(df, output_path)
+        return len(df)
+
+    logger.info("Appending to existing data...")
+    existing_ids = read_table(output_path, columns=['video_id'])['video_id']
+    new_df = df[~df['video_id'].isin(existing_ids)]
+    if not new_df.empty:
+        append_table(new_df, output_path)
+
+    total = len(existing_ids) + len(new_df)
+    logger.info(f"Combined dataset: {total} total videos (added {len(new_df)} new)")
+    return total
+
+def save_cluster_batches(batches, output_path, incremental, logger, on_batch=None):
+    """Save each cluster's videos as soon as it is fetched.
+
+    A full refresh writes every batch through one open TableWriter, holding
+    one batch in memory at a time, and keeps the IDs written so far to skip
+    videos already stored by an earlier batch. The stored data is replaced
+    once the last batch is written. An incremental run onto existing data
+    collects the new videos and appends them with a single
+    save_cluster_data call. All batches of a run share one run_timestamp.
+    If on_batch is given, it is called with each batch before the batch is
+    saved.
+
+    Returns:
+        Number of videos stored, or None if no batch was received
+    """
+    run_timestamp = datetime.now(timezone.utc).isoformat()
+
+    def stamped(batches):
+        for batch in batches:
+            batch['run_timestamp'] = run_timestamp
+            if on_batch:
+                on_batch(batch)
+            yield batch.drop_duplicates(subset=['video_id'], keep='last')
+
+    if incremental and table_exists(output_path):
+        new_batches = list(stamped(batches))
+        if not new_batches:
+            return None
+        new_df = pd.concat(new_batches, ignore_index=True).drop_duplicates(subset=['video_id'])
+        return save_cluster_data(new_df, output_path, incremental, logger)
+
+    seen_ids = set()
+    received = False
+    with TableWriter(output_path) as writer:
+        for batch in stamped(batches):
+            received = True
+            batch = batch[~batch['video_id'].isin(seen_ids)]
+            seen_ids.update(batch['video_id'])
+            writer.write(batch)
+    return len(seen_ids) if received else None
 
 # --- Execution Block ---
 
@@ -208,6 +382,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Ingest YouTube video data')
     parser.add_argument('--incremental', action='store_true', help='Only fetch new videos since last run')
     parser.add_argument('--full-refresh', action='store_true', help='Fetch all videos (disable incremental mode)')
+    parser.add_argument('--force-refresh', action='store_true', help='Re-download playlists instead of revalidating cached responses')
     args = parser.parse_args()
 
     # Load environment and configuration
@@ -241,32 +416,17 @@ if __name__ == "__main__":
         logger.error(f"Configuration file not found at {config.paths.cluster_config}. Did you create it?")
         exit(1)
 
-    # Run ingestion
-    df = ingest_clusters(my_clusters, API_KEY, config, logger, quota_tracker,
-                        incremental=incremental_mode, metadata_mgr=metadata_mgr)
-
-    if not df.empty:
-        # Add timestamp for temporal analysis
-        df['run_timestamp'] = datetime.now(timezone.utc).isoformat()
-
-        # In incremental mode, append to existing data
-        output_path = config.paths.cluster_data
-        if incremental_mode and os.path.exists(output_path):
-            logger.info("Appending to existing data...")
-            existing_df = pd.read_csv(output_path)
-            df = pd.concat([existing_df, df], ignore_index=True)
-            # Deduplicate by video_id (keep most recent)
-            df = df.drop_duplicates(subset=['video_id'], keep='last')
-            logger.info(f"Combined dataset: {len(df)} total videos (added {len(df) - len(existing_df)} new)")
-
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        df.to_csv(output_path, index=False)
+    # Run ingestion, saving each cluster as soon as it is fetched
+    batches = iter_cluster_batches(my_clusters, API_KEY, config, logger, quota_tracker,
+                                   incremental=incremental_mode, metadata_mgr=metadata_mgr, force_refresh=args.force_refresh)
+    output_path = config.paths.cluster_data
+    total_videos = save_cluster_batches(batches, output_path, incremental_mode, logger)
 
-        logger.info(f"Success! Saved {len(df)} videos to {output_path}")
-        logger.info(f"\nSample data:\n{df[['cluster', 'channel_name', 'title', 'publish_date']].head()}")
+    if total_videos is not None:
+        logger.info(f"Success! Saved {total_videos} videos to {output_path}")
 
         # Update metadata
-        metadata_mgr.update_ingest(len(df))
+        metadata_mgr.update_ingest(total_videos)
 
         # Save historical snapshot for temporal analysis
         save_historical_snapshot(config, logger)
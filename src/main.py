@@ -13,6 +13,9 @@ from pathlib import Path
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Ingested cluster batches waiting for analysis before ingest blocks
+PIPELINE_QUEUE_SIZE = 4
+
 
 def main():
     """Main CLI entry point with subcommands."""
@@ -45,11 +48,34 @@ Examples:
 
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
 
-    # --- Ingest Command ---
-    ingest_parser = subparsers.add_parser(
-        'ingest',
-        help='Fetch video metadata from YouTube API'
-    )
+    # The top-level parser has no options of its own, so the first positional
+    # token names the command. Only that command's arguments are defined.
+    argv = sys.argv[1:]
+    selected = next((arg for arg in argv if not arg.startswith('-')), None)
+
+    for name, (help_text, add_arguments, _) in COMMANDS.items():
+        command_parser = subparsers.add_parser(name, help=help_text)
+        if name == selected:
+            add_arguments(command_parser)
+
+    # Parse arguments
+    args = parser.parse_args(argv)
+
+    if not args.command:
+        parser.print_help()
+        return
+
+    # Change to project root
+    project_root = Path(__file__).parent.parent
+    os.chdir(project_root)
+
+    # Execute command
+    _, _, run_command = COMMANDS[args.command]
+    run_command(args)
+
+
+def _add_ingest_arguments(ingest_parser):
+    """Define arguments of the ingest command."""
     ingest_parser.add_argument(
         '--incremental',
         action='store_true',
@@ -60,12 +86,15 @@ Examples:
         action='store_true',
         help='Fetch all videos (disable incremental mode)'
     )
-
-    # --- Analyze Command ---
-    analyze_parser = subparsers.add_parser(
-        'analyze',
-        help='Run AI analysis on video transcripts'
+    ingest_parser.add_argument(
+        '--force-refresh',
+        action='store_true',
+        help='Re-download playlists instead of revalidating cached responses'
     )
+
+
+def _add_analyze_arguments(analyze_parser):
+    """Define arguments of the analyze command."""
     analyze_parser.add_argument(
         '--incremental',
         action='store_true',
@@ -83,23 +112,24 @@ Examples:
         help='Number of parallel workers (default: 10)'
     )
 
-    # --- Visualize Command ---
-    visualize_parser = subparsers.add_parser(
-        'visualize',
-        help='Generate all visualizations from analyzed data'
-    )
+
+def _add_visualize_arguments(visualize_parser):
+    """Define arguments of the visualize command."""
     visualize_parser.add_argument(
         '--output-dir',
         type=str,
         default='figures',
         help='Output directory for figures (default: figures)'
     )
-
-    # --- Temporal Command ---
-    temporal_parser = subparsers.add_parser(
-        'temporal',
-        help='Run temporal trend analysis'
+    visualize_parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Regenerate all figures even if their inputs are unchanged'
     )
+
+
+def _add_temporal_arguments(temporal_parser):
+    """Define arguments of the temporal command."""
     temporal_parser.add_argument(
         '--days-back',
         type=int,
@@ -117,11 +147,9 @@ Examples:
         help='End date for analysis (YYYY-MM-DD)'
     )
 
-    # --- Compare Command ---
-    compare_parser = subparsers.add_parser(
-        'compare',
-        help='Run cross-cluster comparison analysis'
-    )
+
+def _add_compare_arguments(compare_parser):
+    """Define arguments of the compare command."""
     compare_parser.add_argument(
         '--output',
         type=str,
@@ -129,11 +157,9 @@ Examples:
         help='Output directory for comparison plots (default: figures/comparison)'
     )
 
-    # --- Collect Historical Command ---
-    historical_parser = subparsers.add_parser(
-        'collect-historical',
-        help='Collect multi-year historical data'
-    )
+
+def _add_collect_historical_arguments(historical_parser):
+    """Define arguments of the collect-historical command."""
     historical_parser.add_argument(
         '--start-year',
         type=int,
@@ -162,11 +188,9 @@ Examples:
         help='Collection frequency (default: monthly)'
     )
 
-    # --- Pipeline Command (Run all stages) ---
-    pipeline_parser = subparsers.add_parser(
-        'pipeline',
-        help='Run full pipeline: ingest → analyze → visualize'
-    )
+
+def _add_pipeline_arguments(pipeline_parser):
+    """Define arguments of the pipeline command."""
     pipeline_parser.add_argument(
         '--incremental',
         action='store_true',
@@ -179,45 +203,16 @@ Examples:
         help='Number of parallel workers for analysis (default: 10)'
     )
 
-    # Parse arguments
-    args = parser.parse_args()
-
-    if not args.command:
-        parser.print_help()
-        return
-
-    # Change to project root
-    project_root = Path(__file__).parent.parent
-    os.chdir(project_root)
 
-    # Execute command
-    if args.command == 'ingest':
-        run_ingest(args)
-    elif args.command == 'analyze':
-        run_analyze(args)
-    elif args.command == 'visualize':
-        run_visualize(args)
-    elif args.command == 'temporal':
-        run_temporal(args)
-    elif args.command == 'compare':
-        run_compare(args)
-    elif args.command == 'collect-historical':
-        run_collect_historical(args)
-    elif args.command == 'pipeline':
-        run_pipeline(args)
-
-
-def run_ingest(args):
+def run_ingest(args, on_batch=None):
     """Run data ingestion."""
     print("🔄 Running data ingestion...")
-    from src.ingest import ingest_clusters
+    from src.ingest import iter_cluster_batches, save_cluster_batches
     from src.utils.config_loader import load_config
     from src.utils.logger import setup_logger, QuotaTracker
     from src.utils.metadata_manager import MetadataManager
     from dotenv import load_dotenv
     import json
-    import pandas as pd
-    from datetime import datetime, timezone
 
     load_dotenv()
     config = load_config()
@@ -234,30 +229,20 @@ def run_ingest(args):
     # Determine mode
     incremental = args.incremental or (not args.full_refresh and metadata_mgr.should_run_incremental("ingest"))
 
-    # Run ingestion
-    df = ingest_clusters(clusters, api_key, config, logger, quota_tracker,
-                        incremental=incremental, metadata_mgr=metadata_mgr)
-
-    if not df.empty:
-        df['run_timestamp'] = datetime.now(timezone.utc).isoformat()
-
-        output_path = config.paths.cluster_data
+    # Run ingestion, saving each cluster as soon as it is fetched
+    batches = iter_cluster_batches(clusters, api_key, config, logger, quota_tracker,
+                                   incremental=incremental, metadata_mgr=metadata_mgr,
+                                   force_refresh=args.force_refresh)
+    output_path = config.paths.cluster_data
+    total_videos = save_cluster_batches(batches, output_path, incremental, logger, on_batch=on_batch)
 
-        # Append or overwrite
-        if incremental and os.path.exists(output_path):
-            existing_df = pd.read_csv(output_path)
-            df = pd.concat([existing_df, df], ignore_index=True)
-            df = df.drop_duplicates(subset=['video_id'], keep='last')
-
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        df.to_csv(output_path, index=False)
-
-        metadata_mgr.update_ingest(len(df))
+    if total_videos is not None:
+        metadata_mgr.update_ingest(total_videos)
 
         from src.temporal_analysis import save_historical_snapshot
         save_historical_snapshot(config, logger)
 
-        print(f"✅ Ingestion complete! Saved {len(df)} videos to {output_path}")
+        print(f"✅ Ingestion complete! Saved {total_videos} videos to {output_path}")
     else:
         print("⚠️  No data collected.")
 
@@ -287,7 +272,7 @@ def run_visualize(args):
     config = load_config()
     logger = setup_logger("visualize")
 
-    generate_all_visualizations()
+    generate_all_visualizations(force=args.force)
     print(f"✅ Visualizations saved to {args.output_dir}/")
 
 
@@ -356,9 +341,43 @@ def run_pipeline(args):
     # Step 1: Ingest
     ingest_args = argparse.Namespace(
         incremental=args.incremental,
-        full_refresh=not args.incremental
+        full_refresh=not args.incremental,
+        force_refresh=False
     )
-    run_ingest(ingest_args)
+
+    from src.utils.config_loader import load_config
+    config = load_config()
+
+    if config.analysis.enable_caching:
+        # Analyze each cluster while the next one is being ingested. The
+        # analysis step below then assembles its results from the cache.
+        import queue
+        import threading
+        from src.analyze import analyze_batches
+        from src.utils.logger import setup_logger
+
+        batches = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        analyzer_errors = []
+
+        def _analyze():
+            try:
+                analyze_batches(batches, config, setup_logger("pipeline"), args.workers)
+            except Exception as e:
+                analyzer_errors.append(e)
+
+        analyzer = threading.Thread(target=_analyze)
+        analyzer.start()
+        try:
+            run_ingest(ingest_args, on_batch=batches.put)
+        finally:
+            batches.put(None)
+            analyzer.join()
+
+        # Surface a failed analyzer in the main thread instead of losing it
+        if analyzer_errors:
+            raise analyzer_errors[0]
+    else:
+        run_ingest(ingest_args)
 
     # Step 2: Analyze
     analyze_args = argparse.Namespace(
@@ -369,11 +388,23 @@ def run_pipeline(args):
     run_analyze(analyze_args)
 
     # Step 3: Visualize
-    visualize_args = argparse.Namespace(output_dir='figures')
+    visualize_args = argparse.Namespace(output_dir='figures', force=False)
     run_visualize(visualize_args)
 
     print("✅ Full pipeline complete!")
 
 
+# Command name -> (help text, argument definitions, runner)
+COMMANDS = {
+    'ingest': ('Fetch video metadata from YouTube API', _add_ingest_arguments, run_ingest),
+    'analyze': ('Run AI analysis on video transcripts', _add_analyze_arguments, run_analyze),
+    'visualize': ('Generate all visualizations from analyzed data', _add_visualize_arguments, run_visualize),
+    'temporal': ('Run temporal trend analysis', _add_temporal_arguments, run_temporal),
+    'compare': ('Run cross-cluster comparison analysis', _add_compare_arguments, run_compare),
+    'collect-historical': ('Collect multi-year historical data', _add_collect_historical_arguments, run_collect_historical),
+    'pipeline': ('Run full pipeline: ingest → analyze → visualize', _add_pipeline_arguments, run_pipeline),
+}
+
+
 if __name__ == "__main__":
     main()
@@ -2,12 +2,14 @@
 
 import os
 import sys
-import json
+import pickle
+import hashlib
 import logging
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
-from collections import defaultdict, Counter
+from collections import Counter
 from typing import Dict, List, Tuple, Optional
 
 # Add parent directory to path for imports
@@ -15,13 +17,34 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.utils.config_loader import load_config
 from src.utils.logger import setup_logger
+from src.utils.json_utils import dump_to_file
+from src.utils.table_io import PARQUET_AVAILABLE, PARQUET_COMPRESSION, read_table, resolve_table_path
+
+# Snapshot file holding one row per (video, theme) and the columns read from it
+THEMES_LONG_FILE = "themes_long.parquet"
+THEME_COLUMNS = ['cluster', 'theme', 'sentiment']
+
+# Pickled per-snapshot counts, keyed by snapshot file modification times
+HISTORICAL_CACHE_DIR = Path("data/cache/historical")
+
+# Most recently used pickles kept on disk, so callers with different
+# look-back windows do not evict each other
+HISTORICAL_CACHE_FILES = 4
+
+# Sentiment labels reported in trends, in display order
+SENTIMENT_LABELS = ['Positive', 'Neutral', 'Negative', 'Mixed']
+
+# Low-cardinality snapshot columns stored as categoricals
+CATEGORICAL_COLUMNS = {'cluster': 'category', 'sentiment': 'category'}
 
 
 def save_historical_snapshot(config, logger):
     """
     Save current data to historical archive.
 
-    Creates a dated directory and copies current CSV files.
+    Creates a dated directory and copies the current data files. When pyarrow
+    is installed, CSV analyzed data is also stored as Parquet for faster
+    loading, together with a long-form table of its themes.
     """
     # Get current date for directory name
     today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
@@ -29,37 +52,45 @@ def save_historical_snapshot(config, logger):
     historical_dir.mkdir(parents=True, exist_ok=True)
 
     # Copy current files to historical
-    cluster_data_path = Path(config.paths.cluster_data)
-    analyzed_data_path = Path(config.paths.analyzed_data)
+    cluster_data_path = resolve_table_path(config.paths.cluster_data)
+    analyzed_data_path = resolve_table_path(config.paths.analyzed_data)
 
     if cluster_data_path.exists():
         import shutil
-        shutil.copy(cluster_data_path, historical_dir / "cluster_data.csv")
+        shutil.copy(cluster_data_path, historical_dir / f"cluster_data{cluster_data_path.suffix}")
         logger.info(f"Saved cluster data snapshot to {historical_dir}")
 
     if analyzed_data_path.exists():
         import shutil
-        shutil.copy(analyzed_data_path, historical_dir / "analyzed_data.csv")
+        shutil.copy(analyzed_data_path, historical_dir / f"analyzed_data{analyzed_data_path.suffix}")
+        if PARQUET_AVAILABLE:
+            df_analyzed = read_table(analyzed_data_path)
+            if analyzed_data_path.suffix != '.parquet':
+                df_analyzed.to_parquet(historical_dir / "analyzed_data.parquet", compression=PARQUET_COMPRESSION)
+
+            # Split themes once here so trend analysis reads them pre-exploded
+            explode_themes(df_analyzed)[THEME_COLUMNS].to_parquet(
+                historical_dir / THEMES_LONG_FILE, compression=PARQUET_COMPRESSION, index=False
+            )
         logger.info(f"Saved analyzed data snapshot to {historical_dir}")
 
     return historical_dir
 
 
-def load_historical_runs(days_back: int = 30) -> List[Tuple[str, pd.DataFrame]]:
+def _historical_snapshot_files(historical_dir: Path, days_back: int,
+                               candidates: Tuple[str, ...]) -> Tuple[Tuple[str, str, int], ...]:
     """
-    Load historical analyzed data from past N days.
+    List the snapshot files to load for the past N days.
 
     Args:
+        historical_dir: Root directory of the historical archive
         days_back: Number of days to look back
+        candidates: Snapshot file names in order of preference
 
     Returns:
-        List of (date_string, dataframe) tuples
+        Tuple of (date_string, file_path, mtime_ns) entries, oldest first
     """
-    historical_dir = Path("data/historical")
-    if not historical_dir.exists():
-        return []
-
-    runs = []
+    files = []
     cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_back)
 
     for date_dir in sorted(historical_dir.iterdir()):
@@ -72,15 +103,159 @@ def load_historical_runs(days_back: int = 30) -> List[Tuple[str, pd.DataFrame]]:
             if dir_date.replace(tzinfo=timezone.utc) < cutoff_date:
                 continue
 
-            # Load analyzed data if it exists
-            analyzed_file = date_dir / "analyzed_data.csv"
-            if analyzed_file.exists():
-                df = pd.read_csv(analyzed_file)
-                runs.append((date_dir.name, df))
-        except (ValueError, FileNotFoundError) as e:
+            # Use the first candidate present in this snapshot
+            for name in candidates:
+                snapshot_file = date_dir / name
+                if snapshot_file.exists():
+                    files.append((date_dir.name, str(snapshot_file), snapshot_file.stat().st_mtime_ns))
+                    break
+        except (ValueError, FileNotFoundError):
+            continue
+
+    return tuple(files)
+
+
+def _read_snapshot_file(path: str, columns: List[str]) -> pd.DataFrame:
+    """
+    Read columns of one snapshot file.
+
+    Args:
+        path: Snapshot file path
+        columns: Columns to read
+
+    Returns:
+        DataFrame with cluster and sentiment stored as categoricals
+    """
+    if path.endswith('.parquet'):
+        df = pd.read_parquet(path, columns=columns)
+    else:
+        df = pd.read_csv(path, usecols=lambda c: c in columns)
+    return df.astype({col: dtype for col, dtype in CATEGORICAL_COLUMNS.items() if col in df.columns})
+
+
+def _summarize_snapshot_files(
+    theme_files: Tuple[Tuple[str, str, int], ...],
+    run_files: Tuple[Tuple[str, str, int], ...]
+) -> Tuple[List[Tuple[str, pd.DataFrame]], List[Tuple[str, pd.DataFrame]]]:
+    """
+    Count the themes and sentiments of each snapshot, one file at a time.
+
+    Args:
+        theme_files: Snapshot files to count themes in
+        run_files: Snapshot files to count sentiments in
+
+    Returns:
+        Tuple of (theme_counts, sentiment_counts), see load_historical_summaries
+    """
+    theme_counts = []
+    for date, path, _ in theme_files:
+        try:
+            theme_column = 'theme' if path.endswith(THEMES_LONG_FILE) else 'themes'
+            df = _read_snapshot_file(path, columns=['cluster', theme_column])
+        except (ValueError, FileNotFoundError):
+            continue
+        themes = df if 'theme' in df.columns else explode_themes(df)
+        theme_counts.append((date, themes.groupby(['cluster', 'theme'], sort=False, observed=True)
+                             .size().reset_index(name='count')))
+
+    sentiment_counts = []
+    for date, path, _ in run_files:
+        try:
+            df = _read_snapshot_file(path, columns=['cluster', 'sentiment'])
+        except (ValueError, FileNotFoundError):
             continue
+        sentiment_counts.append((date, df.groupby(['cluster', 'sentiment'], sort=False, observed=True)
+                                 .size().reset_index(name='count')))
+
+    return theme_counts, sentiment_counts
+
+
+def load_historical_summaries(days_back: int = 30) -> Tuple[List[Tuple[str, pd.DataFrame]],
+                                                             List[Tuple[str, pd.DataFrame]]]:
+    """
+    Load per-snapshot theme and sentiment counts from past N days.
+
+    Each snapshot file is read, counted and released before the next one is
+    read, so only the small count tables are held for the whole period. The
+    results can be passed to compare_theme_trends and
+    calculate_sentiment_trends.
+
+    The counts are pickled, keyed by the snapshot file modification times,
+    so rewriting any snapshot invalidates the cache. Only the
+    HISTORICAL_CACHE_FILES most recently used pickles are kept on disk.
+
+    Args:
+        days_back: Number of days to look back
+
+    Returns:
+        Tuple of (theme_counts, sentiment_counts) lists of (date_string,
+        dataframe) tuples. The frames hold 'cluster', 'theme' or 'sentiment',
+        and 'count' columns, in first-appearance order.
+    """
+    historical_dir = Path("data/historical")
+    if not historical_dir.exists():
+        return [], []
+
+    run_candidates = ("analyzed_data.csv",)
+    theme_candidates = run_candidates
+    if PARQUET_AVAILABLE:
+        run_candidates = ("analyzed_data.parquet",) + run_candidates
+        theme_candidates = (THEMES_LONG_FILE,) + run_candidates
+
+    theme_files = _historical_snapshot_files(historical_dir, days_back, theme_candidates)
+    run_files = _historical_snapshot_files(historical_dir, days_back, run_candidates)
+
+    key = hashlib.sha1(repr((theme_files, run_files)).encode('utf-8')).hexdigest()
+    cache_file = HISTORICAL_CACHE_DIR / f"historical_{key}.pkl"
+
+    if cache_file.exists():
+        try:
+            with open(cache_file, 'rb') as f:
+                summaries = pickle.load(f)
+            os.utime(cache_file)
+            return summaries
+        except Exception:
+            pass
+
+    summaries = _summarize_snapshot_files(theme_files, run_files)
+
+    try:
+        HISTORICAL_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(cache_file, 'wb') as f:
+            pickle.dump(summaries, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # Drop the least recently used pickles, including earlier snapshot states
+        cache_files = sorted(HISTORICAL_CACHE_DIR.glob("historical_*.pkl"),
+                             key=lambda path: path.stat().st_mtime_ns, reverse=True)
+        for stale_file in cache_files[HISTORICAL_CACHE_FILES:]:
+            stale_file.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+    return summaries
+
+
+def explode_themes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Split the pipe-delimited themes of each video into one row per theme.
+
+    Args:
+        df: DataFrame with 'cluster' and 'themes' columns
+
+    Returns:
+        DataFrame with a stripped, non-empty 'theme' column in place of
+        'themes', keeping the other columns. Rows are grouped by cluster in
+        order of first appearance and keep the video order within a cluster.
+    """
+    videos = df[df['themes'].notna()]
+    videos = videos.iloc[np.argsort(pd.factorize(videos['cluster'])[0], kind='stable')]
+
+    # Split themes (format: "Theme 1 | Theme 2 | Theme 3") into one row per theme
+    exploded = videos.assign(theme=videos['themes'].astype(str).str.split('|')).explode('theme')
+    themes = exploded['theme'].str.strip()
+    exploded = exploded.assign(theme=themes)[themes != '']
 
-    return runs
+    return exploded.drop(columns='themes').reset_index(drop=True)
 
 
 def extract_themes_by_cluster(df: pd.DataFrame) -> Dict[str, List[str]]:
@@ -93,18 +268,13 @@ def extract_themes_by_cluster(df: pd.DataFrame) -> Dict[str, List[str]]:
     Returns:
         Dictionary mapping cluster name to list of themes
     """
-    themes_by_cluster = defaultdict(list)
+    videos = df.loc[df['themes'].notna(), ['cluster', 'themes']]
+    exploded = explode_themes(videos)
 
-    for _, row in df.iterrows():
-        if pd.isna(row.get('themes')):
-            continue
-
-        cluster = row['cluster']
-        # Split themes (format: "Theme 1 | Theme 2 | Theme 3")
-        themes = [t.strip() for t in str(row['themes']).split('|') if t.strip()]
-        themes_by_cluster[cluster].extend(themes)
+    grouped = exploded.groupby('cluster', sort=False, observed=True, dropna=False)['theme'].agg(list).to_dict()
 
-    return dict(themes_by_cluster)
+    # Keep clusters whose videos had only blank themes, in first-appearance order
+    return {cluster: grouped.get(cluster, []) for cluster in videos['cluster'].unique()}
 
 
 def calculate_theme_frequency(themes: List[str]) -> Dict[str, int]:
@@ -126,7 +296,11 @@ def compare_theme_trends(historical_runs: List[Tuple[str, pd.DataFrame]],
     Compare theme prevalence over time.
 
     Args:
-        historical_runs: List of (date, dataframe) tuples
+        historical_runs: List of (date, dataframe) tuples, either with a
+            pipe-delimited 'themes' column or pre-split into a 'theme' column
+            (as in themes_long.parquet snapshots). Pre-split frames may carry
+            a 'count' column with the number of rows each one stands for (see
+            load_historical_summaries).
         cluster: Optional cluster name to filter by
 
     Returns:
@@ -135,28 +309,31 @@ def compare_theme_trends(historical_runs: List[Tuple[str, pd.DataFrame]],
     if not historical_runs:
         return pd.DataFrame()
 
-    # Build time series of theme frequencies
-    theme_series = []
+    dates = [date for date, _ in historical_runs]
 
-    for date, df in historical_runs:
+    # Stack every snapshot into one long-form frame, one row per (video, theme)
+    # or per counted theme
+    snapshots = []
+    for day, (date, df) in enumerate(historical_runs):
         if cluster:
             df = df[df['cluster'] == cluster]
+        if 'theme' not in df.columns:
+            df = explode_themes(df[['cluster', 'themes']])
+        snapshots.append(df[['theme']].assign(day=day, count=df['count'] if 'count' in df.columns else 1))
+    exploded = pd.concat(snapshots, ignore_index=True)
 
-        themes_by_cluster = extract_themes_by_cluster(df)
-        all_themes = []
-        for cluster_themes in themes_by_cluster.values():
-            all_themes.extend(cluster_themes)
+    if exploded.empty:
+        return pd.DataFrame(index=pd.Index(dates, name='date'))
 
-        freq = calculate_theme_frequency(all_themes)
-        freq['date'] = date
-        theme_series.append(freq)
+    # Theme columns follow first appearance by snapshot, then cluster, then
+    # video, which is the row order of the exploded snapshots
+    theme_codes, themes = pd.factorize(exploded['theme'])
 
-    # Convert to DataFrame
-    df_trends = pd.DataFrame(theme_series)
-    df_trends = df_trends.set_index('date')
-    df_trends = df_trends.fillna(0)
+    # Scatter-add the counts straight into the (date, theme) matrix
+    counts = np.zeros((len(dates), len(themes)), dtype=np.int64)
+    np.add.at(counts, (exploded['day'].to_numpy(), theme_codes), exploded['count'].to_numpy())
 
-    return df_trends
+    return pd.DataFrame(counts, index=pd.Index(dates, name='date'), columns=themes.astype(str))
 
 
 def identify_emerging_themes(df_trends: pd.DataFrame, threshold: float = 2.0) -> List[str]:
@@ -173,24 +350,15 @@ def identify_emerging_themes(df_trends: pd.DataFrame, threshold: float = 2.0) ->
     if len(df_trends) < 2:
         return []
 
-    emerging = []
-
     # Compare most recent to previous period
-    recent = df_trends.iloc[-1]
-    previous = df_trends.iloc[-2]
+    recent = df_trends.iloc[-1].to_numpy(dtype=float)
+    previous = df_trends.iloc[-2].to_numpy(dtype=float)
 
-    for theme in df_trends.columns:
-        prev_count = previous.get(theme, 0)
-        recent_count = recent.get(theme, 0)
+    # Avoid division by zero: new themes count as emerging
+    ratio = recent / np.where(previous == 0, 1, previous)
+    mask = np.where(previous == 0, recent > 0, ratio >= threshold)
 
-        # Avoid division by zero
-        if prev_count == 0:
-            if recent_count > 0:
-                emerging.append(theme)
-        elif recent_count / prev_count >= threshold:
-            emerging.append(theme)
-
-    return emerging
+    return df_trends.columns[mask].tolist()
 
 
 def identify_declining_themes(df_trends: pd.DataFrame, threshold: float = 0.5) -> List[str]:
@@ -207,24 +375,15 @@ def identify_declining_themes(df_trends: pd.DataFrame, threshold: float = 0.5) -
     if len(df_trends) < 2:
         return []
 
-    declining = []
-
     # Compare most recent to previous period
-    recent = df_trends.iloc[-1]
-    previous = df_trends.iloc[-2]
+    recent = df_trends.iloc[-1].to_numpy(dtype=float)
+    previous = df_trends.iloc[-2].to_numpy(dtype=float)
 
-    for theme in df_trends.columns:
-        prev_count = previous.get(theme, 0)
-        recent_count = recent.get(theme, 0)
+    # Theme must have existed before
+    ratio = recent / np.where(previous == 0, 1, previous)
+    mask = (previous > 0) & ((recent == 0) | (ratio <= threshold))
 
-        # Theme must have existed before
-        if prev_count > 0:
-            if recent_count == 0:
-                declining.append(theme)
-            elif recent_count / prev_count <= threshold:
-                declining.append(theme)
-
-    return declining
+    return df_trends.columns[mask].tolist()
 
 
 def calculate_sentiment_trends(historical_runs: List[Tuple[str, pd.DataFrame]],
@@ -233,37 +392,40 @@ def calculate_sentiment_trends(historical_runs: List[Tuple[str, pd.DataFrame]],
     Calculate sentiment distribution over time.
 
     Args:
-        historical_runs: List of (date, dataframe) tuples
+        historical_runs: List of (date, dataframe) tuples. Frames may carry
+            a 'count' column with the number of videos each row stands for
+            (see load_historical_summaries).
         cluster: Optional cluster name to filter by
 
     Returns:
         DataFrame with sentiment percentages over time
     """
-    sentiment_series = []
-
-    for date, df in historical_runs:
-        if cluster:
-            df = df[df['cluster'] == cluster]
-
-        # Count sentiments
-        total = len(df[df['sentiment'].notna()])
-        if total == 0:
-            continue
+    if not historical_runs:
+        return pd.DataFrame()
 
-        sentiment_counts = df['sentiment'].value_counts()
+    # Stack every snapshot into one frame keyed by date
+    combined = pd.concat(
+        [df[['cluster', 'sentiment']].assign(date=date, count=df['count'] if 'count' in df.columns else 1)
+         for date, df in historical_runs],
+        ignore_index=True
+    )
+
+    if cluster:
+        combined = combined[combined['cluster'] == cluster]
+    combined = combined[combined['sentiment'].notna()]
+    if combined.empty:
+        return pd.DataFrame()
 
-        sentiment_pct = {
-            'date': date,
-            'Positive': (sentiment_counts.get('Positive', 0) / total) * 100,
-            'Neutral': (sentiment_counts.get('Neutral', 0) / total) * 100,
-            'Negative': (sentiment_counts.get('Negative', 0) / total) * 100,
-            'Mixed': (sentiment_counts.get('Mixed', 0) / total) * 100
-        }
-        sentiment_series.append(sentiment_pct)
+    df_sentiment = pd.crosstab(
+        combined['date'], combined['sentiment'].astype(object),
+        values=combined['count'], aggfunc='sum', normalize='index'
+    ) * 100
 
-    df_sentiment = pd.DataFrame(sentiment_series)
-    if not df_sentiment.empty:
-        df_sentiment = df_sentiment.set_index('date')
+    # Keep snapshot order and skip snapshots without any sentiment
+    df_sentiment = df_sentiment.reindex(
+        index=combined['date'].unique(), columns=SENTIMENT_LABELS, fill_value=0
+    )
+    df_sentiment.columns.name = None
 
     return df_sentiment
 
@@ -281,8 +443,8 @@ def generate_temporal_report(days_back: int = 30, cluster: Optional[str] = None)
     """
     logger = logging.getLogger("temporal-analysis")
 
-    # Load historical data
-    historical_runs = load_historical_runs(days_back)
+    # Load per-snapshot counts; the trends only need these, not the videos
+    theme_runs, historical_runs = load_historical_summaries(days_back)
 
     if len(historical_runs) < 2:
         logger.warning(f"Need at least 2 historical runs for trend analysis. Found: {len(historical_runs)}")
@@ -294,8 +456,8 @@ def generate_temporal_report(days_back: int = 30, cluster: Optional[str] = None)
 
     logger.info(f"Analyzing {len(historical_runs)} historical runs over {days_back} days")
 
-    # Calculate theme trends
-    theme_trends = compare_theme_trends(historical_runs, cluster)
+    # Calculate theme trends from the pre-split themes
+    theme_trends = compare_theme_trends(theme_runs, cluster)
 
     # Identify emerging and declining themes
     emerging = identify_emerging_themes(theme_trends)
@@ -364,8 +526,7 @@ if __name__ == "__main__":
 
         # Save report to JSON
         report_path = Path("data/temporal_report.json")
-        with open(report_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        dump_to_file(report, report_path)
         logger.info(f"\n💾 Full report saved to {report_path}")
     else:
         logger.warning(f"⚠️  {report['message']}")
@@ -1,11 +1,14 @@
 """Cache management for transcripts and analysis results."""
 
 import json
+import time
 import logging
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime, timezone
 
+from src.utils.json_utils import load_from_file, dump_to_file
+
 
 class CacheManager:
     """Manages caching for transcripts and analysis results."""
@@ -21,6 +24,7 @@ class CacheManager:
         self.cache_dir = Path(cache_dir)
         self.transcripts_dir = self.cache_dir / "transcripts"
         self.analysis_dir = self.cache_dir / "analysis"
+        self.video_stats_path = self.cache_dir / "video_stats.json"
         self.logger = logger or logging.getLogger(__name__)
 
         # Create cache directories
@@ -94,8 +98,7 @@ class CacheManager:
             self.cache_hits += 1
             self.logger.debug(f"Cache hit: analysis for {video_id}")
             try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return load_from_file(cache_file)
             except Exception as e:
                 self.logger.error(f"Error reading cached analysis for {video_id}: {e}")
                 return None
@@ -132,6 +135,72 @@ class CacheManager:
             self.logger.error(f"Error caching analysis for {video_id}: {e}")
             return False
 
+    def get_video_stats(self, video_ids: List[str], ttl_seconds: float = 3600) -> Dict[str, int]:
+        """
+        Retrieve cached view counts that are younger than the TTL.
+
+        Args:
+            video_ids: YouTube video IDs to look up
+            ttl_seconds: Maximum age of a cached entry in seconds
+
+        Returns:
+            Dictionary mapping video ID to view count for fresh cache hits
+        """
+        entries = self._load_video_stats()
+        cutoff = time.time() - ttl_seconds
+
+        cached = {}
+        for video_id in video_ids:
+            entry = entries.get(video_id)
+            if entry is not None and entry["cached_at"] >= cutoff:
+                cached[video_id] = entry["views"]
+
+        self.cache_hits += len(cached)
+        self.cache_misses += len(video_ids) - len(cached)
+        self.logger.debug(f"Video stats cache: {len(cached)}/{len(video_ids)} hits")
+        return cached
+
+    def save_video_stats(self, stats_map: Dict[str, int], ttl_seconds: Optional[float] = None) -> bool:
+        """
+        Save view counts to cache.
+
+        Args:
+            stats_map: Dictionary mapping video ID to view count
+            ttl_seconds: If given, entries older than this are evicted
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not stats_map:
+            return True
+
+        entries = self._load_video_stats()
+        now = time.time()
+        if ttl_seconds is not None:
+            cutoff = now - ttl_seconds
+            entries = {video_id: entry for video_id, entry in entries.items()
+                       if entry["cached_at"] >= cutoff}
+        for video_id, views in stats_map.items():
+            entries[video_id] = {"views": int(views), "cached_at": now}
+
+        try:
+            dump_to_file(entries, self.video_stats_path, indent=False)
+            self.logger.debug(f"Cached view counts for {len(stats_map)} videos")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error caching video stats: {e}")
+            return False
+
+    def _load_video_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Load the video stats cache file."""
+        if not self.video_stats_path.exists():
+            return {}
+        try:
+            return load_from_file(self.video_stats_path)
+        except Exception as e:
+            self.logger.error(f"Error reading video stats cache: {e}")
+            return {}
+
     def clear_transcript_cache(self) -> int:
         """
         Clear all cached transcripts.
@@ -13,6 +13,7 @@ class IngestConfig(BaseModel):
     cache_channel_ids: bool = Field(default=True, description="Whether to cache channel ID lookups")
     channel_id_cache_path: str = Field(default="data/channel_ids.json", description="Path to channel ID cache")
     playlist_id_cache_path: str = Field(default="data/playlist_ids.json", description="Path to playlist ID cache")
+    playlist_items_cache_path: str = Field(default="data/playlist_items.json", description="Path to cached playlist responses and their ETags")
 
 
 class AnalysisConfig(BaseModel):
@@ -70,8 +71,8 @@ class PathsConfig(BaseModel):
     data_dir: str = Field(default="data", description="Main data directory")
     config_dir: str = Field(default="config", description="Configuration directory")
     cluster_config: str = Field(default="config/clusters.json", description="Path to cluster configuration")
-    cluster_data: str = Field(default="data/cluster_data.csv", description="Path to cluster data CSV")
-    analyzed_data: str = Field(default="data/analyzed_data.csv", description="Path to analyzed data CSV")
+    cluster_data: str = Field(default="data/cluster_data.parquet", description="Path to cluster data (Parquet or CSV)")
+    analyzed_data: str = Field(default="data/analyzed_data.parquet", description="Path to analyzed data (Parquet or CSV)")
     logs_dir: str = Field(default="logs", description="Directory for log files")
 
 
@@ -0,0 +1,26 @@
+"""Helpers for writing rendered figures to disk."""
+
+import io
+from pathlib import Path
+from typing import Union
+
+# Render buffer reused for every figure saved by this process
+_BUFFER = io.BytesIO()
+
+
+def save_figure(fig, path: Union[str, Path], **savefig_options):
+    """
+    Render a figure in memory and write it to a file in a single write.
+
+    Args:
+        fig: Matplotlib figure to save
+        path: Destination file path; its suffix selects the image format
+        **savefig_options: Extra options passed to Figure.savefig
+    """
+    path = Path(path)
+    _BUFFER.seek(0)
+    _BUFFER.truncate()
+    fig.savefig(_BUFFER, format=path.suffix.lstrip('.') or 'png', **savefig_options)
+
+    with _BUFFER.getbuffer() as data, open(path, 'wb') as f:
+        f.write(data)
@@ -0,0 +1,98 @@
+"""Fast JSON serialization helpers for metadata and reports."""
+
+import os
+import json
+import mmap
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson installed
+    orjson = None
+
+# Files at least this large are parsed straight from a memory map
+MMAP_THRESHOLD_BYTES = 16 * 1024 * 1024
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON bytes.
+
+    Uses orjson when installed, falling back to the standard library.
+
+    Args:
+        obj: Object to serialize (numpy scalars/arrays are supported with orjson)
+        indent: Whether to pretty-print with 2-space indentation
+
+    Returns:
+        JSON document as bytes
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Parse a JSON document from bytes or text.
+
+    Args:
+        data: JSON document
+
+    Returns:
+        Parsed object
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_to_file(obj: Any, path: Union[str, Path], indent: bool = True):
+    """
+    Serialize an object and write it to a file in a single write.
+
+    Args:
+        obj: Object to serialize
+        path: Destination file path
+        indent: Whether to pretty-print with 2-space indentation
+    """
+    data = dumps(obj, indent=indent)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def load_from_file(path: Union[str, Path]) -> Any:
+    """
+    Read and parse a JSON file.
+
+    Args:
+        path: JSON file path
+
+    Returns:
+        Parsed object
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+
+        if orjson is not None and size >= MMAP_THRESHOLD_BYTES:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+
+        # Read the whole file unbuffered, usually in a single syscall
+        chunks = []
+        remaining = size
+        while remaining > 0:
+            chunk = os.read(f.fileno(), remaining)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        data = chunks[0] if len(chunks) == 1 else b''.join(chunks)
+
+    return loads(data)
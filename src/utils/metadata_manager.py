@@ -1,10 +1,21 @@
 """Metadata management for incremental processing."""
 
-import json
+import os
 import logging
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+
+from src.utils.json_utils import dumps, dump_to_file, load_from_file
+
+# Number of recent runs kept inline in metadata.json; the full history lives
+# in the append-only pipeline_runs.ndjson next to it.
+MAX_PIPELINE_RUNS = 500
+
+# Columns of the in-memory run window. Runs are stored column-wise (one list
+# per field) rather than as a list of small dicts. For analysis runs
+# "videos" holds the total number of videos processed.
+RUN_FIELDS = ("type", "timestamp", "videos", "analyzed", "skipped")
 
 
 class MetadataManager:
@@ -19,6 +30,7 @@ class MetadataManager:
             logger: Optional logger instance
         """
         self.metadata_path = Path(metadata_path)
+        self.runs_log_path = self.metadata_path.parent / "pipeline_runs.ndjson"
         self.logger = logger or logging.getLogger(__name__)
         self.metadata = self._load()
 
@@ -26,13 +38,33 @@ class MetadataManager:
         """Load metadata from file."""
         if self.metadata_path.exists():
             try:
-                with open(self.metadata_path, 'r') as f:
-                    return json.load(f)
+                metadata = load_from_file(self.metadata_path)
             except Exception as e:
                 self.logger.warning(f"Error loading metadata: {e}. Starting fresh.")
                 return self._default_metadata()
+
+            # Migrate the legacy list-of-dicts run history to columns
+            if "pipeline_runs" in metadata:
+                legacy_runs = metadata.pop("pipeline_runs")
+                metadata.setdefault("total_runs", len(legacy_runs))
+                metadata["runs"] = self._runs_to_columns(legacy_runs[-MAX_PIPELINE_RUNS:])
+            metadata.setdefault("runs", self._runs_to_columns([]))
+            metadata.setdefault("total_runs", len(metadata["runs"]["type"]))
+            return metadata
         return self._default_metadata()
 
+    @staticmethod
+    def _runs_to_columns(runs: List[Dict[str, Any]]) -> Dict[str, list]:
+        """Convert run records to the column-wise layout."""
+        columns = {field: [] for field in RUN_FIELDS}
+        for run in runs:
+            columns["type"].append(run.get("type"))
+            columns["timestamp"].append(run.get("timestamp"))
+            columns["videos"].append(run.get("videos", run.get("total_videos")))
+            columns["analyzed"].append(run.get("analyzed"))
+            columns["skipped"].append(run.get("skipped"))
+        return columns
+
     def _default_metadata(self) -> Dict[str, Any]:
         """Return default metadata structure."""
         return {
@@ -40,7 +72,8 @@ class MetadataManager:
             "last_analysis_timestamp": None,
             "total_videos_ingested": 0,
             "total_videos_analyzed": 0,
-            "pipeline_runs": [],
+            "total_runs": 0,
+            "runs": self._runs_to_columns([]),  # last MAX_PIPELINE_RUNS runs
             "created_at": datetime.now(timezone.utc).isoformat()
         }
 
@@ -48,12 +81,58 @@ class MetadataManager:
         """Save metadata to file."""
         try:
             self.metadata_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.metadata_path, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
+            dump_to_file(self.metadata, self.metadata_path)
             self.logger.debug(f"Saved metadata to {self.metadata_path}")
         except Exception as e:
             self.logger.error(f"Error saving metadata: {e}")
 
+    def _record_run(self, run: Dict[str, Any]):
+        """
+        Record a pipeline run in the rolling window and the full history log.
+
+        Args:
+            run: Run record to store
+        """
+        columns = self.metadata["runs"]
+        for field, values in self._runs_to_columns([run]).items():
+            columns[field].append(values[0])
+            if len(columns[field]) > MAX_PIPELINE_RUNS:
+                del columns[field][:-MAX_PIPELINE_RUNS]
+        self.metadata["total_runs"] += 1
+
+        try:
+            self.runs_log_path.parent.mkdir(parents=True, exist_ok=True)
+            line = dumps(run) + b"\n"
+            fd = os.open(self.runs_log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+        except Exception as e:
+            self.logger.error(f"Error appending to run history: {e}")
+
+    def get_pipeline_runs(self) -> List[Dict[str, Any]]:
+        """
+        Get the recent pipeline runs as individual records.
+
+        Returns:
+            List of run dictionaries, oldest first
+        """
+        columns = self.metadata["runs"]
+        runs = []
+        for run_type, timestamp, videos, analyzed, skipped in zip(*(columns[f] for f in RUN_FIELDS)):
+            if run_type == "analysis":
+                runs.append({
+                    "type": run_type,
+                    "timestamp": timestamp,
+                    "total_videos": videos,
+                    "analyzed": analyzed,
+                    "skipped": skipped
+                })
+            else:
+                runs.append({"type": run_type, "timestamp": timestamp, "videos": videos})
+        return runs
+
     def get_last_ingest_timestamp(self) -> Optional[str]:
         """Get timestamp of last ingestion run."""
         return self.metadata.get("last_ingest_timestamp")
@@ -73,7 +152,7 @@ class MetadataManager:
         self.metadata["last_ingest_timestamp"] = timestamp
         self.metadata["total_videos_ingested"] += int(num_videos)
 
-        self.metadata["pipeline_runs"].append({
+        self._record_run({
             "type": "ingest",
             "timestamp": timestamp,
             "videos": int(num_videos)
@@ -94,7 +173,7 @@ class MetadataManager:
         self.metadata["last_analysis_timestamp"] = timestamp
         self.metadata["total_videos_analyzed"] += int(num_analyzed)
 
-        self.metadata["pipeline_runs"].append({
+        self._record_run({
             "type": "analysis",
             "timestamp": timestamp,
             "total_videos": int(num_videos),
@@ -110,7 +189,7 @@ class MetadataManager:
         return {
             "total_videos_ingested": self.metadata.get("total_videos_ingested", 0),
             "total_videos_analyzed": self.metadata.get("total_videos_analyzed", 0),
-            "total_runs": len(self.metadata.get("pipeline_runs", [])),
+            "total_runs": self.metadata["total_runs"],
             "last_ingest": self.metadata.get("last_ingest_timestamp"),
             "last_analysis": self.metadata.get("last_analysis_timestamp"),
             "created_at": self.metadata.get("created_at")
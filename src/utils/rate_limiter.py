@@ -3,11 +3,13 @@
 import time
 import logging
 import random
+import itertools
 import threading
 from functools import wraps
 from typing import Optional, Callable, Any
 from googleapiclient.errors import HttpError
 from src.utils.logger import QuotaExceededException
+from src.utils.json_utils import loads
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -17,6 +19,12 @@ from tenacity import (
     RetryError
 )
 
+# Size of the precomputed jittered delay schedule (power of two for cheap masking)
+_DELAY_SCHEDULE_SIZE = 1024
+
+# 403 error reasons that indicate quota/rate limiting rather than a real client error
+_QUOTA_REASONS = frozenset({'quotaExceeded', 'rateLimitExceeded', 'userRateLimitExceeded'})
+
 
 class RateLimiter:
     """
@@ -39,19 +47,43 @@ class RateLimiter:
         self.requests_per_second = requests_per_second
         self.burst_size = burst_size
 
-        # Token bucket state
+        # Token bucket state (monotonic clock is immune to wall-clock adjustments)
         self._tokens = float(burst_size)
-        self._last_update = time.time()
+        self._last_update = time.monotonic()
         self._lock = threading.RLock()
 
     def _add_tokens(self):
         """Add tokens based on elapsed time."""
-        now = time.time()
+        now = time.monotonic()
         elapsed = now - self._last_update
         tokens_to_add = elapsed * self.requests_per_second
         self._tokens = min(self._tokens + tokens_to_add, self.burst_size)
         self._last_update = now
 
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """
+        Consume tokens only if they are available right now, without waiting.
+
+        Never blocks: if another thread holds the lock, this returns False
+        and the caller should fall back to acquire().
+
+        Args:
+            tokens: Number of tokens to acquire (default: 1.0)
+
+        Returns:
+            True if the tokens were consumed, False otherwise
+        """
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._add_tokens()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+        finally:
+            self._lock.release()
+
     def acquire(self, tokens: float = 1.0) -> float:
         """
         Block until tokens are available, then consume them.
@@ -63,14 +95,14 @@ class RateLimiter:
             Delay in seconds that was waited
         """
         with self._lock:
-            start_time = time.time()
+            start_time = time.monotonic()
 
             while True:
                 self._add_tokens()
 
                 if self._tokens >= tokens:
                     self._tokens -= tokens
-                    delay = time.time() - start_time
+                    delay = time.monotonic() - start_time
                     if delay > 0.01:  # Log significant delays
                         self.logger.debug(f"Rate limiter waited {delay:.2f}s")
                     return delay
@@ -144,34 +176,36 @@ class YouTubeAPIRateLimiter:
 
             # 403 might be quota exceeded
             if status == 403:
-                try:
-                    import json
-                    error_content = json.loads(error.content.decode('utf-8'))
-                    reason = error_content.get('error', {}).get('errors', [{}])[0].get('reason', '')
-                    if reason in ['quotaExceeded', 'rateLimitExceeded', 'userRateLimitExceeded']:
-                        return True
-                except:
-                    pass
+                # Parse the error body once per exception; retries re-check the same object
+                reason = getattr(error, '_cached_reason', None)
+                if reason is None:
+                    try:
+                        error_content = loads(error.content)
+                        reason = error_content.get('error', {}).get('errors', [{}])[0].get('reason', '')
+                    except Exception:
+                        reason = ''
+                    error._cached_reason = reason
+                return reason in _QUOTA_REASONS
 
         return False
 
-    def _should_retry(self, exception: Exception) -> bool:
+    def is_retryable(self, error: Exception) -> bool:
         """
         Determine if an error should trigger a retry.
 
         Args:
-            exception: Exception to evaluate
+            error: Exception to evaluate
 
         Returns:
             True if we should retry, False otherwise
         """
-        if not isinstance(exception, HttpError):
+        if not isinstance(error, HttpError):
             return False
 
-        status = exception.resp.status
+        status = error.resp.status
 
         # Retry on rate limit errors (429, 403 quota)
-        if self._is_rate_limit_error(exception):
+        if self._is_rate_limit_error(error):
             return True
 
         # Retry on server errors (5xx)
@@ -198,6 +232,20 @@ class YouTubeAPIRateLimiter:
         Returns:
             Decorated function with rate limiting
         """
+        # Build the retry wrapper once at decoration time, not per call
+        retry_decorator = retry(
+            retry=retry_if_exception(self.is_retryable),
+            stop=stop_after_attempt(self.max_retries),
+            wait=wait_exponential(
+                multiplier=self.backoff_multiplier,
+                min=self.min_delay,
+                max=self.max_delay
+            ),
+            before_sleep=before_sleep_log(self.logger, logging.WARNING),
+            reraise=True
+        )
+        retried_func = retry_decorator(func)
+
         @wraps(func)
         def wrapper(*args, **kwargs) -> Any:
             if not self.enabled:
@@ -206,27 +254,14 @@ class YouTubeAPIRateLimiter:
             # Check if quota is already exceeded before even trying
             self.quota_tracker.check_quota()
 
-            # Apply tenacity retry decorator dynamically
-            retry_decorator = retry(
-                retry=retry_if_exception(self._should_retry),
-                stop=stop_after_attempt(self.max_retries),
-                wait=wait_exponential(
-                    multiplier=self.backoff_multiplier,
-                    min=self.min_delay,
-                    max=self.max_delay
-                ),
-                before_sleep=before_sleep_log(self.logger, logging.WARNING),
-                reraise=True
-            )
-
-            # Apply rate limiting first
-            delay = self.rate_limiter.acquire()
-            if delay > 0.01:
-                self.quota_tracker.log_throttle(delay)
+            # Apply rate limiting first (fast path when a token is free)
+            if not self.rate_limiter.try_acquire():
+                delay = self.rate_limiter.acquire()
+                if delay > 0.01:
+                    self.quota_tracker.log_throttle(delay)
 
             # Then apply retry logic
             try:
-                retried_func = retry_decorator(func)
                 result = retried_func(*args, **kwargs)
                 return result
             except RetryError as e:
@@ -266,7 +301,16 @@ class TranscriptRateLimiter:
         self.delay_jitter = ts_config.delay_jitter
         self.max_retries = ts_config.max_retries
 
-        self._last_fetch_time = 0
+        # Precompute jittered delays so the locked section avoids random() calls
+        base_delay = (self.min_delay + self.max_delay) / 2
+        self._delays = [
+            base_delay + base_delay * self.delay_jitter * random.random()
+            for _ in range(_DELAY_SCHEDULE_SIZE)
+        ]
+        self._delay_index = itertools.count()
+
+        # Monotonic timestamp of the last fetch; -inf so the first fetch never waits
+        self._last_fetch_time = float('-inf')
         self._lock = threading.RLock()
 
     def _calculate_delay(self) -> float:
@@ -276,12 +320,9 @@ class TranscriptRateLimiter:
         Returns:
             Delay in seconds
         """
-        # Base delay between min and max
-        base_delay = (self.min_delay + self.max_delay) / 2
-
-        # Add random jitter (±delay_jitter%)
-        jitter_amount = base_delay * self.delay_jitter * random.random()
-        return base_delay + jitter_amount
+        # Base delay between min and max plus random jitter (+delay_jitter%),
+        # cycled from the schedule built at init
+        return self._delays[next(self._delay_index) & (_DELAY_SCHEDULE_SIZE - 1)]
 
     def rate_limit_transcript_fetch(self, func: Callable) -> Callable:
         """
@@ -307,7 +348,7 @@ class TranscriptRateLimiter:
 
             with self._lock:
                 # Calculate delay since last fetch
-                now = time.time()
+                now = time.monotonic()
                 time_since_last = now - self._last_fetch_time
 
                 delay = self._calculate_delay()
@@ -317,7 +358,7 @@ class TranscriptRateLimiter:
                     self.logger.debug(f"Transcript fetch delay: {wait_time:.2f}s (jitter)")
                     time.sleep(wait_time)
 
-                self._last_fetch_time = time.time()
+                self._last_fetch_time = time.monotonic()
 
             # Simple retry logic for transcript fetching
             last_error = None
@@ -0,0 +1,215 @@
+"""Storage helpers for the pipeline's tabular data files."""
+
+import os
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:  # pragma: no cover - exercised only without pyarrow installed
+    PARQUET_AVAILABLE = False
+
+PARQUET_COMPRESSION = 'zstd'
+
+logger = logging.getLogger("table-io")
+
+# Parquet paths already warned about for a leftover legacy CSV
+_warned_legacy_paths = set()
+
+
+def is_parquet(path: Union[str, Path]) -> bool:
+    """Return whether a data path is stored as Parquet."""
+    return Path(path).suffix == '.parquet'
+
+
+def resolve_table_path(path: Union[str, Path]) -> Path:
+    """
+    Locate the file backing a configured data path.
+
+    Data written before the switch to Parquet sits in a CSV file next to
+    the configured path. That file is used until the Parquet file exists;
+    afterwards a leftover CSV is ignored with a warning.
+
+    Args:
+        path: Configured data path
+
+    Returns:
+        Path of the file to read
+    """
+    path = Path(path)
+    if is_parquet(path):
+        legacy_path = path.with_suffix('.csv')
+        if not path.exists():
+            if legacy_path.exists():
+                return legacy_path
+        elif legacy_path.exists() and path not in _warned_legacy_paths:
+            _warned_legacy_paths.add(path)
+            logger.warning(f"Ignoring {legacy_path}: {path} exists and is used instead. "
+                           f"Remove the CSV once it is no longer needed.")
+    return path
+
+
+def table_exists(path: Union[str, Path]) -> bool:
+    """Return whether a data path (or its legacy CSV) exists."""
+    return resolve_table_path(path).exists()
+
+
+def read_table(path: Union[str, Path],
+               columns: Optional[List[str]] = None,
+               dtype: Optional[Dict[str, str]] = None,
+               dtype_backend: Optional[str] = None,
+               **csv_options) -> pd.DataFrame:
+    """
+    Read a data table from Parquet or CSV, based on the file extension.
+
+    Args:
+        path: Data file path
+        columns: Only read these columns (all columns if None)
+        dtype: Column dtypes to apply after reading
+        dtype_backend: 'pyarrow' to keep columns in Arrow-backed dtypes,
+            so string methods run as Arrow compute kernels
+        **csv_options: Extra options passed to pd.read_csv for CSV files
+
+    Returns:
+        DataFrame with the table contents
+    """
+    path = resolve_table_path(path)
+    backend_options = {'dtype_backend': dtype_backend} if dtype_backend else {}
+    if is_parquet(path):
+        df = pd.read_parquet(path, columns=columns, **backend_options)
+        return df.astype(dtype) if dtype else df
+    return pd.read_csv(path, usecols=columns, dtype=dtype, **backend_options, **csv_options)
+
+
+def write_table(df: pd.DataFrame, path: Union[str, Path]):
+    """
+    Write a data table to Parquet or CSV, based on the file extension.
+
+    Args:
+        df: DataFrame to write
+        path: Destination file path
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if is_parquet(path):
+        df.to_parquet(path, compression=PARQUET_COMPRESSION, index=False)
+    else:
+        df.to_csv(path, index=False)
+
+
+class TableWriter:
+    """
+    Write a data table in chunks through one open file.
+
+    Parquet chunks go through a single ParquetWriter and CSV chunks are
+    appended to one open file handle. Chunks are written to a temporary
+    file that replaces the table when the writer is closed, so readers see
+    the previous table until then. Every chunk is aligned to the columns of
+    the first one. Nothing is replaced if no chunk was written.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: Destination file path
+        """
+        self.path = Path(path)
+        self._tmp_path = self.path.with_name(self.path.name + '.tmp')
+        self._columns = None
+        self._parquet_writer = None
+        self._csv_file = None
+
+    def write(self, df: pd.DataFrame):
+        """
+        Write one chunk of rows.
+
+        Args:
+            df: Rows to write
+        """
+        if self._columns is None:
+            self._columns = list(df.columns)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        df = df.reindex(columns=self._columns)
+
+        if is_parquet(self.path):
+            schema = self._parquet_writer.schema if self._parquet_writer else None
+            table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self._tmp_path, table.schema,
+                                                        compression=PARQUET_COMPRESSION)
+            self._parquet_writer.write_table(table)
+        else:
+            header = self._csv_file is None
+            if header:
+                self._csv_file = open(self._tmp_path, 'w', newline='')
+            df.to_csv(self._csv_file, header=header, index=False)
+
+    def close(self):
+        """Finish the file and move it into place."""
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        elif self._csv_file is not None:
+            self._csv_file.close()
+        else:
+            return
+        self._parquet_writer = self._csv_file = None
+        os.replace(self._tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def append_table(df: pd.DataFrame, path: Union[str, Path]):
+    """
+    Append rows to an existing data table without loading it into pandas.
+
+    CSV rows are appended in place. A Parquet file cannot be extended, so
+    its row groups are streamed into a new file followed by the new rows,
+    holding one row group in memory at a time. Tables whose columns do not
+    cover the new rows, and legacy CSVs behind a Parquet path, are merged
+    in memory and rewritten to the configured path instead.
+
+    Args:
+        df: Rows to append
+        path: Configured data path; the table must already exist
+    """
+    path = Path(path)
+    existing_path = resolve_table_path(path)
+
+    if existing_path == path and not is_parquet(path):
+        columns = pd.read_csv(path, nrows=0).columns
+        if set(df.columns) <= set(columns):
+            df.reindex(columns=columns).to_csv(path, mode='a', header=False, index=False)
+            return
+
+    if existing_path == path and is_parquet(path):
+        parquet_file = pq.ParquetFile(path)
+        schema = parquet_file.schema_arrow
+        if set(df.columns) <= set(schema.names):
+            try:
+                new_rows = pa.Table.from_pandas(
+                    df.reindex(columns=schema.names), schema=schema, preserve_index=False
+                )
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                new_rows = None
+
+            if new_rows is not None:
+                tmp_path = path.with_name(path.name + '.tmp')
+                with pq.ParquetWriter(tmp_path, schema, compression=PARQUET_COMPRESSION) as writer:
+                    for i in range(parquet_file.num_row_groups):
+                        writer.write_table(parquet_file.read_row_group(i))
+                    writer.write_table(new_rows)
+                parquet_file.close()
+                os.replace(tmp_path, path)
+                return
+        parquet_file.close()
+
+    write_table(pd.concat([read_table(existing_path), df], ignore_index=True), path)
@@ -2,24 +2,70 @@
 
 import os
 import sys
+import pickle
+import hashlib
 import logging
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-import seaborn as sns
 from pathlib import Path
 from typing import Dict, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from src.cross_cluster_analysis import (
     load_analyzed_data,
-    extract_themes_by_cluster,
-    calculate_cluster_similarity,
+    calculate_cluster_similarity_from_themes,
+    sparse_theme_matrix_from_frequency,
     calculate_theme_frequency_by_cluster,
+    theme_frequency_from_df,
+    find_echo_chamber_themes_from_frequency,
     calculate_sentiment_divergence,
+    build_sentiment_table,
+    normalize_theme,
+    SENTIMENTS,
     identify_consensus_topics
 )
+from src.utils.figure_io import save_figure
+from src.utils.table_io import resolve_table_path
+
+# Resolution of the bulk comparison PNGs
+COMPARISON_DPI = 150
+
+# Figure reused by every plot in this module, see _get_figure
+_FIGURE = None
+
+# Pickled theme aggregations, keyed by the analyzed data file's mtime and size
+COMPARISON_CACHE_DIR = Path("data/cache/comparison")
+
+# Bumped whenever the pickled aggregation changes shape
+COMPARISON_CACHE_VERSION = 2
+
+
+class _SafeFilenameTable(dict):
+    """str.translate table keeping alphanumerics and mapping anything else to '_'."""
+
+    def __missing__(self, code):
+        char = chr(code)
+        self[code] = replacement = char if char.isalnum() else '_'
+        return replacement
+
+
+_SAFE_TABLE = _SafeFilenameTable()
+
+
+def _get_figure(figsize):
+    """Return the module's figure, cleared and resized for the next plot."""
+    global _FIGURE
+    if _FIGURE is None:
+        _FIGURE = plt.figure(figsize=figsize, layout='constrained')
+    else:
+        _FIGURE.clear()
+        _FIGURE.set_size_inches(figsize)
+    return _FIGURE
 
 
 def plot_cluster_similarity_heatmap(df_similarity: pd.DataFrame,
@@ -28,38 +74,43 @@ def plot_cluster_similarity_heatmap(df_similarity: pd.DataFrame,
     Plot cluster similarity as a heatmap.
 
     Args:
-        df_similarity: Similarity matrix from calculate_cluster_similarity
+        df_similarity: Similarity matrix from calculate_cluster_similarity_from_themes
         output_path: Where to save the plot
     """
-    fig, ax = plt.subplots(figsize=(10, 8))
+    fig = _get_figure((10, 8))
+    ax = fig.add_subplot()
 
     # Create heatmap
-    sns.heatmap(
-        df_similarity,
-        annot=True,
-        fmt='.2f',
-        cmap='YlOrRd',
-        square=True,
-        cbar_kws={'label': 'Cosine Similarity'},
-        ax=ax
-    )
+    values = df_similarity.to_numpy()
+    im = ax.imshow(values, cmap='YlOrRd', aspect='equal')
+    fig.colorbar(im, ax=ax, label='Cosine Similarity')
+
+    ax.set_xticks(range(len(df_similarity.columns)))
+    ax.set_xticklabels(df_similarity.columns, rotation=45, ha='right')
+    ax.set_yticks(range(len(df_similarity.index)))
+    ax.set_yticklabels(df_similarity.index)
+
+    # Annotate cells, using white text on the dark end of the colormap
+    for i in range(values.shape[0]):
+        for j in range(values.shape[1]):
+            ax.text(j, i, f'{values[i, j]:.2f}', ha='center', va='center',
+                    color='white' if im.norm(values[i, j]) > 0.6 else 'black')
 
     ax.set_title('Cluster Similarity Based on Theme Overlap', fontsize=14, fontweight='bold')
     ax.set_xlabel('Cluster', fontsize=12)
     ax.set_ylabel('Cluster', fontsize=12)
 
-    plt.tight_layout()
-
     # Save
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    save_figure(fig, output_path, dpi=COMPARISON_DPI)
     print(f"Saved cluster similarity heatmap to {output_path}")
-    plt.close()
+    fig.clear()
 
 
 def plot_sentiment_comparison(df: pd.DataFrame,
                               theme: str,
-                              output_path: str = "figures/sentiment_comparison.png"):
+                              output_path: str = "figures/sentiment_comparison.png",
+                              sentiment_table: Optional[pd.DataFrame] = None):
     """
     Plot sentiment comparison for a specific theme across clusters.
 
@@ -67,16 +118,28 @@ def plot_sentiment_comparison(df: pd.DataFrame,
         df: Analyzed data DataFrame
         theme: Theme to analyze
         output_path: Where to save the plot
+        sentiment_table: Optional table from build_sentiment_table, shared
+            across themes
     """
-    divergence = calculate_sentiment_divergence(df, theme)
-
-    if not divergence:
+    if sentiment_table is None:
+        divergence = pd.DataFrame.from_dict(calculate_sentiment_divergence(df, theme), orient='index')
+    elif normalize_theme(theme) in sentiment_table.index.get_level_values('theme'):
+        divergence = sentiment_table.xs(normalize_theme(theme), level='theme')
+    else:
+        divergence = pd.DataFrame()
+
+    if divergence.empty:
         print(f"No sentiment data found for theme: {theme}")
         return
 
+    _plot_sentiment_divergence(divergence, theme, output_path)
+
+
+def _plot_sentiment_divergence(divergence: pd.DataFrame, theme: str, output_path: str):
+    """Draw a stacked sentiment bar chart from a cluster x sentiment table."""
     # Prepare data for plotting
-    clusters = list(divergence.keys())
-    sentiments = ['Positive', 'Neutral', 'Negative', 'Mixed']
+    clusters = divergence.index.tolist()
+    sentiments = SENTIMENTS
     colors = {
         'Positive': '#2ecc71',
         'Neutral': '#95a5a6',
@@ -85,14 +148,14 @@ def plot_sentiment_comparison(df: pd.DataFrame,
     }
 
     # Create stacked bar chart
-    fig, ax = plt.subplots(figsize=(12, 6))
+    fig = _get_figure((12, 6))
+    ax = fig.add_subplot()
 
-    bottom = [0] * len(clusters)
-    for sentiment in sentiments:
-        values = [divergence[cluster].get(sentiment, 0) for cluster in clusters]
-        ax.bar(clusters, values, bottom=bottom, label=sentiment,
+    # sentiment x cluster percentages; each segment sits on the rows above it
+    values = divergence.reindex(columns=sentiments, fill_value=0).to_numpy(dtype=float).T
+    for i, sentiment in enumerate(sentiments):
+        ax.bar(clusters, values[i], bottom=values[:i].sum(axis=0), label=sentiment,
                color=colors[sentiment], alpha=0.8)
-        bottom = [b + v for b, v in zip(bottom, values)]
 
     ax.set_xlabel('Cluster', fontsize=12)
     ax.set_ylabel('Percentage (%)', fontsize=12)
@@ -101,29 +164,32 @@ def plot_sentiment_comparison(df: pd.DataFrame,
     ax.set_ylim(0, 100)
     ax.grid(True, alpha=0.3, axis='y')
 
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
 
     # Save
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    save_figure(fig, output_path, dpi=COMPARISON_DPI)
     print(f"Saved sentiment comparison plot to {output_path}")
-    plt.close()
+    fig.clear()
 
 
-def plot_theme_distribution(themes_by_cluster: Dict[str, list],
+def plot_theme_distribution(themes_by_cluster: Optional[Dict[str, list]],
                            top_n: int = 15,
-                           output_path: str = "figures/theme_distribution.png"):
+                           output_path: str = "figures/theme_distribution.png",
+                           df_freq: Optional[pd.DataFrame] = None):
     """
     Plot theme frequency distribution across clusters.
 
     Args:
-        themes_by_cluster: Dictionary mapping cluster to list of themes
+        themes_by_cluster: Dictionary mapping cluster to list of themes (unused
+            when df_freq is given)
         top_n: Number of top themes to show
         output_path: Where to save the plot
+        df_freq: Optional precomputed cluster x theme frequency matrix
     """
     # Calculate frequency matrix
-    df_freq = calculate_theme_frequency_by_cluster(themes_by_cluster)
+    if df_freq is None:
+        df_freq = calculate_theme_frequency_by_cluster(themes_by_cluster)
 
     # Get top N themes overall
     total_freq = df_freq.sum(axis=0).sort_values(ascending=False)
@@ -133,7 +199,8 @@ def plot_theme_distribution(themes_by_cluster: Dict[str, list],
     df_top = df_freq[top_themes].T
 
     # Create grouped bar chart
-    fig, ax = plt.subplots(figsize=(14, 8))
+    fig = _get_figure((14, 8))
+    ax = fig.add_subplot()
 
     df_top.plot(kind='barh', ax=ax, width=0.8)
 
@@ -143,13 +210,11 @@ def plot_theme_distribution(themes_by_cluster: Dict[str, list],
     ax.legend(title='Cluster', bbox_to_anchor=(1.05, 1), loc='upper left')
     ax.grid(True, alpha=0.3, axis='x')
 
-    plt.tight_layout()
-
     # Save
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    save_figure(fig, output_path, dpi=COMPARISON_DPI)
     print(f"Saved theme distribution plot to {output_path}")
-    plt.close()
+    fig.clear()
 
 
 def plot_consensus_vs_echo_chamber(consensus_topics: list,
@@ -163,7 +228,8 @@ def plot_consensus_vs_echo_chamber(consensus_topics: list,
         echo_chamber: Dictionary mapping cluster to unique themes
         output_path: Where to save the plot
     """
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+    fig = _get_figure((16, 6))
+    ax1, ax2 = fig.subplots(1, 2)
 
     # Left: Top consensus topics
     if consensus_topics:
@@ -192,38 +258,95 @@ def plot_consensus_vs_echo_chamber(consensus_topics: list,
                      fontsize=12, fontweight='bold')
         ax2.grid(True, alpha=0.3, axis='y')
 
-    plt.tight_layout()
-
     # Save
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    save_figure(fig, output_path, dpi=COMPARISON_DPI)
     print(f"Saved consensus vs echo chamber plot to {output_path}")
-    plt.close()
+    fig.clear()
+
+
+def _plot_sentiment_worker(divergence: pd.DataFrame, theme: str, output_path: str):
+    """Render one sentiment comparison plot in a worker process."""
+    try:
+        _plot_sentiment_divergence(divergence, theme, output_path)
+        return theme, None
+    except Exception as e:
+        return theme, str(e)
 
 
-def generate_all_comparison_plots(df: pd.DataFrame):
+def _aggregate_themes(df: pd.DataFrame, source_path: Optional[str] = None):
+    """
+    Count themes per cluster into a cluster x theme frequency matrix.
+
+    When the analyzed data file is given, the result is cached on disk and
+    reused until the file's modification time or size changes. Only the
+    newest cached aggregation is kept.
+
+    Args:
+        df: Analyzed data DataFrame
+        source_path: File the DataFrame was loaded from, if any
+
+    Returns:
+        DataFrame with clusters as index and normalized themes as columns
+    """
+    cache_file = None
+    if source_path is not None:
+        path = resolve_table_path(source_path)
+        stat = path.stat()
+        key = hashlib.sha1(repr((COMPARISON_CACHE_VERSION, str(path.resolve()), stat.st_mtime_ns, stat.st_size)).encode('utf-8')).hexdigest()
+        cache_file = COMPARISON_CACHE_DIR / f"themes_{key}.pkl"
+
+        if cache_file.exists():
+            try:
+                with open(cache_file, 'rb') as f:
+                    return pickle.load(f)
+            except Exception:
+                pass
+
+    df_freq = theme_frequency_from_df(df)
+
+    if cache_file is not None:
+        try:
+            COMPARISON_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, 'wb') as f:
+                pickle.dump(df_freq, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            # Aggregations of earlier versions of the file can no longer be hit
+            for stale_file in COMPARISON_CACHE_DIR.glob("themes_*.pkl"):
+                if stale_file != cache_file:
+                    stale_file.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    return df_freq
+
+
+def generate_all_comparison_plots(df: pd.DataFrame, source_path: Optional[str] = None,
+                                  parallel: bool = True):
     """
     Generate all cross-cluster comparison visualizations.
 
     Args:
         df: Analyzed data DataFrame
+        source_path: File df was loaded from; enables the theme aggregation cache
+        parallel: Render the topic sentiment plots in a process pool; pass
+            False when already running inside a worker process
     """
     logger = logging.getLogger("cluster-comparison-plots")
     logger.info("Generating cross-cluster comparison visualizations...")
 
-    # Extract data
-    themes_by_cluster = extract_themes_by_cluster(df)
-    df_freq = calculate_theme_frequency_by_cluster(themes_by_cluster)
-    consensus_topics = identify_consensus_topics(themes_by_cluster, min_clusters=3)
+    # One cluster x theme count matrix feeds every theme aggregation
+    df_freq = _aggregate_themes(df, source_path)
+    theme_matrix = sparse_theme_matrix_from_frequency(df_freq)
 
-    # Import echo chamber function
-    from src.cross_cluster_analysis import find_echo_chamber_themes
-    echo_chamber = find_echo_chamber_themes(themes_by_cluster)
+    consensus_topics = identify_consensus_topics(None, min_clusters=3, theme_matrix=theme_matrix)
+    echo_chamber = find_echo_chamber_themes_from_frequency(df_freq)
 
     # Generate plots
     logger.info("Creating theme distribution plot...")
-    plot_theme_distribution(themes_by_cluster,
-                           output_path="figures/comparison/theme_distribution.png")
+    plot_theme_distribution(None,
+                           output_path="figures/comparison/theme_distribution.png",
+                           df_freq=df_freq)
 
     logger.info("Creating consensus vs echo chamber plot...")
     plot_consensus_vs_echo_chamber(consensus_topics, echo_chamber,
@@ -232,7 +355,7 @@ def generate_all_comparison_plots(df: pd.DataFrame):
     # Try to create similarity heatmap (requires sklearn)
     try:
         logger.info("Creating cluster similarity heatmap...")
-        df_similarity = calculate_cluster_similarity(df_freq)
+        df_similarity = calculate_cluster_similarity_from_themes(None, theme_matrix)
         plot_cluster_similarity_heatmap(df_similarity,
                                        output_path="figures/comparison/cluster_similarity.png")
     except ImportError:
@@ -241,12 +364,33 @@ def generate_all_comparison_plots(df: pd.DataFrame):
     # Create sentiment comparison for top consensus topics
     if consensus_topics:
         logger.info("Creating sentiment comparison plots for top topics...")
-        for i, (theme, num_clusters, avg_freq) in enumerate(consensus_topics[:3]):
-            safe_filename = "".join(c if c.isalnum() else "_" for c in theme[:30])
-            plot_sentiment_comparison(
-                df, theme,
-                output_path=f"figures/comparison/sentiment_{safe_filename}.png"
-            )
+        sentiment_table = build_sentiment_table(df)
+        themes = sentiment_table.index.get_level_values('theme')
+
+        # Each plot only gets its theme's small slice of the table
+        jobs = []
+        for theme, num_clusters, avg_freq in consensus_topics[:3]:
+            if theme not in themes:
+                logger.info(f"No sentiment data found for theme: {theme}")
+                continue
+            safe_filename = theme[:30].translate(_SAFE_TABLE)
+            jobs.append((
+                sentiment_table.xs(theme, level='theme'),
+                theme,
+                f"figures/comparison/sentiment_{safe_filename}.png"
+            ))
+
+        # Render the plots in parallel unless this already runs in a worker
+        if parallel and jobs:
+            with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+                futures = [executor.submit(_plot_sentiment_worker, *job) for job in jobs]
+                results = [future.result() for future in as_completed(futures)]
+        else:
+            results = [_plot_sentiment_worker(*job) for job in jobs]
+
+        for theme, error in results:
+            if error:
+                logger.error(f"Error plotting sentiment for '{theme}': {error}")
 
     logger.info("Cross-cluster visualization complete!")
 
@@ -266,6 +410,6 @@ if __name__ == "__main__":
     # Load data
     try:
         df = load_analyzed_data(config)
-        generate_all_comparison_plots(df)
+        generate_all_comparison_plots(df, source_path=config.paths.analyzed_data)
     except FileNotFoundError as e:
         logger.error(str(e))
@@ -2,53 +2,68 @@
 
 import os
 import sys
+import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import logging
 from pathlib import Path
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+from src.utils.figure_io import save_figure
+
+# Resolution of the saved PNGs; bbox_inches='tight' already trims the margins
+SENTIMENT_DPI = 150
+
+# Sentiments in display order and their colors
+SENTIMENT_ORDER = ('Positive', 'Neutral', 'Negative', 'Mixed')
+SENTIMENT_COLORS = ('#2ecc71', '#95a5a6', '#e74c3c', '#f39c12')
+
+# Figure reused by every plot in this module, see _get_figure
+_FIGURE = None
+
+
+def _get_figure(figsize):
+    """Return the module's figure, cleared and resized for the next plot."""
+    global _FIGURE
+    if _FIGURE is None:
+        _FIGURE = plt.figure(figsize=figsize)
+    else:
+        _FIGURE.clear()
+        _FIGURE.set_size_inches(figsize)
+    return _FIGURE
+
 
 def plot_sentiment_distribution_by_cluster(df: pd.DataFrame,
-                                           output_path: str = "figures/sentiment_distribution.png"):
+                                           output_path: str = "figures/sentiment_distribution.png",
+                                           dpi: int = SENTIMENT_DPI):
     """
     Plot sentiment distribution as stacked bar chart by cluster.
 
     Args:
         df: DataFrame with 'cluster' and 'sentiment' columns
-        output_path: Where to save the plot
+        output_path: Where to save the plot; the caller creates its directory
+        dpi: Resolution of the saved PNG
     """
-    # Group by cluster and sentiment
-    sentiment_counts = df.groupby(['cluster', 'sentiment']).size().unstack(fill_value=0)
-
-    # Convert to percentages
-    sentiment_pct = sentiment_counts.div(sentiment_counts.sum(axis=1), axis=0) * 100
+    # Share of each sentiment per cluster, in percent
+    sentiment_pct = pd.crosstab(df['cluster'], df['sentiment'], normalize='index').mul(100).astype(np.float32)
+    sentiment_pct = sentiment_pct.reindex(columns=list(SENTIMENT_ORDER), fill_value=0)
 
     # Create plot
-    fig, ax = plt.subplots(figsize=(12, 6))
-
-    # Define colors
-    colors = {
-        'Positive': '#2ecc71',
-        'Neutral': '#95a5a6',
-        'Negative': '#e74c3c',
-        'Mixed': '#f39c12'
-    }
-
-    # Ensure columns exist
-    for sent in ['Positive', 'Neutral', 'Negative', 'Mixed']:
-        if sent not in sentiment_pct.columns:
-            sentiment_pct[sent] = 0
+    fig = _get_figure((12, 6))
+    ax = fig.add_subplot()
 
     # Plot stacked bars
-    sentiment_pct[['Positive', 'Neutral', 'Negative', 'Mixed']].plot(
+    sentiment_pct.plot(
         kind='bar',
         stacked=True,
         ax=ax,
-        color=[colors[s] for s in ['Positive', 'Neutral', 'Negative', 'Mixed']],
+        color=SENTIMENT_COLORS,
         alpha=0.8
     )
 
@@ -59,37 +74,35 @@ def plot_sentiment_distribution_by_cluster(df: pd.DataFrame,
     ax.set_ylim(0, 100)
     ax.grid(True, alpha=0.3, axis='y')
 
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
 
     # Save
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    save_figure(fig, output_path, dpi=dpi, bbox_inches='tight')
     print(f"Saved sentiment distribution plot to {output_path}")
-    plt.close()
+    fig.clear()
 
 
 def plot_framing_distribution(df: pd.DataFrame,
-                             output_path: str = "figures/framing_distribution.png"):
+                             output_path: str = "figures/framing_distribution.png",
+                             dpi: int = SENTIMENT_DPI):
     """
     Plot framing distribution by cluster.
 
     Args:
         df: DataFrame with 'cluster' and 'framing' columns
-        output_path: Where to save the plot
+        output_path: Where to save the plot; the caller creates its directory
+        dpi: Resolution of the saved PNG
     """
     if 'framing' not in df.columns:
         print("No framing data available")
         return
 
-    # Group by cluster and framing
-    framing_counts = df.groupby(['cluster', 'framing']).size().unstack(fill_value=0)
-
-    # Convert to percentages
-    framing_pct = framing_counts.div(framing_counts.sum(axis=1), axis=0) * 100
+    # Share of each framing per cluster, in percent
+    framing_pct = pd.crosstab(df['cluster'], df['framing'], normalize='index').mul(100).astype(np.float32)
 
     # Create plot
-    fig, ax = plt.subplots(figsize=(12, 6))
+    fig = _get_figure((12, 6))
+    ax = fig.add_subplot()
 
     # Define colors
     colors = {
@@ -118,89 +131,121 @@ def plot_framing_distribution(df: pd.DataFrame,
     ax.set_ylim(0, 100)
     ax.grid(True, alpha=0.3, axis='y')
 
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
 
     # Save
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    save_figure(fig, output_path, dpi=dpi, bbox_inches='tight')
     print(f"Saved framing distribution plot to {output_path}")
-    plt.close()
+    fig.clear()
 
 
 def plot_theme_category_distribution(df: pd.DataFrame,
-                                    output_path: str = "figures/theme_categories.png"):
+                                    output_path: str = "figures/theme_categories.png",
+                                    dpi: int = SENTIMENT_DPI):
     """
     Plot theme category distribution by cluster.
 
     Args:
         df: DataFrame with 'cluster' and 'theme_categories' columns
-        output_path: Where to save the plot
+        output_path: Where to save the plot; the caller creates its directory
+        dpi: Resolution of the saved PNG
     """
     if 'theme_categories' not in df.columns:
         print("No theme category data available")
         return
 
-    # Extract categories by cluster
-    category_data = []
-
-    for _, row in df.iterrows():
-        if pd.isna(row.get('theme_categories')):
-            continue
-
-        cluster = row['cluster']
-        categories = [c.strip() for c in str(row['theme_categories']).split('|') if c.strip()]
-
-        for category in categories:
-            category_data.append({'cluster': cluster, 'category': category})
-
-    if not category_data:
+    # Extract categories by cluster, one row per (video, category)
+    videos = df[['cluster', 'theme_categories']].dropna(subset=['theme_categories'])
+    categories = videos['theme_categories']
+    if not pd.api.types.is_string_dtype(categories):
+        categories = categories.astype(str)
+
+    # Arrow-backed strings split into list arrays that explode without Python objects
+    df_cat = pd.DataFrame({
+        'cluster': videos['cluster'],
+        'category': categories.str.split('|')
+    }).explode('category', ignore_index=True)
+    df_cat['category'] = df_cat['category'].str.strip()
+    df_cat = df_cat[df_cat['category'] != ''].astype({'category': 'category'})
+
+    if df_cat.empty:
         print("No category data to plot")
         return
 
-    df_cat = pd.DataFrame(category_data)
-
-    # Group and count
-    cat_counts = df_cat.groupby(['cluster', 'category']).size().unstack(fill_value=0)
-
-    # Convert to percentages
-    cat_pct = cat_counts.div(cat_counts.sum(axis=1), axis=0) * 100
+    # Share of each category per cluster, in percent
+    cat_pct = pd.crosstab(df_cat['cluster'], df_cat['category'], normalize='index').mul(100).astype(np.float32)
 
     # Create plot
-    fig, ax = plt.subplots(figsize=(14, 6))
+    fig = _get_figure((14, 6))
+    ax = fig.add_subplot()
 
-    cat_pct.plot(kind='bar', ax=ax, alpha=0.8, width=0.8)
+    # One image for the whole table, however many categories there are
+    image = ax.imshow(cat_pct.to_numpy(), aspect='auto', cmap='viridis', vmin=0)
+    fig.colorbar(image, ax=ax, label='Percentage (%)')
 
-    ax.set_xlabel('Cluster', fontsize=12)
-    ax.set_ylabel('Percentage (%)', fontsize=12)
+    ax.set_xticks(range(len(cat_pct.columns)), cat_pct.columns, rotation=45, ha='right')
+    ax.set_yticks(range(len(cat_pct.index)), cat_pct.index)
+    ax.set_xlabel('Category', fontsize=12)
+    ax.set_ylabel('Cluster', fontsize=12)
     ax.set_title('Theme Category Distribution by Cluster', fontsize=14, fontweight='bold')
-    ax.legend(title='Category', bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=9)
-    ax.set_ylim(0, cat_pct.max().max() * 1.1)
-    ax.grid(True, alpha=0.3, axis='y')
-
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
 
     # Save
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    save_figure(fig, output_path, dpi=dpi, bbox_inches='tight')
     print(f"Saved theme category distribution plot to {output_path}")
-    plt.close()
+    fig.clear()
+
+
+def _plot_worker(plot_func, df: pd.DataFrame, output_path: str):
+    """Render one plot in a worker process."""
+    try:
+        plot_func(df, output_path=output_path)
+        return output_path, None
+    except Exception as e:
+        return output_path, str(e)
 
 
-def generate_all_sentiment_plots(df: pd.DataFrame):
+def generate_all_sentiment_plots(df: pd.DataFrame, parallel: bool = True):
     """
     Generate all sentiment and framing visualizations.
 
     Args:
         df: Analyzed data DataFrame
+        parallel: Render the plots in a process pool; pass False when
+            already running inside a worker process
     """
     logger = logging.getLogger("sentiment-plots")
     logger.info("Generating sentiment and framing visualizations...")
 
-    plot_sentiment_distribution_by_cluster(df, output_path="figures/enhanced/sentiment_distribution.png")
-    plot_framing_distribution(df, output_path="figures/enhanced/framing_distribution.png")
-    plot_theme_category_distribution(df, output_path="figures/enhanced/theme_categories.png")
+    # Low-cardinality labels group faster on integer category codes
+    label_columns = [col for col in ('cluster', 'sentiment', 'framing') if col in df.columns]
+    df = df.astype({col: 'category' for col in label_columns})
+
+    tasks = [
+        (plot_sentiment_distribution_by_cluster, ['cluster', 'sentiment'], "figures/enhanced/sentiment_distribution.png"),
+        (plot_framing_distribution, ['cluster', 'framing'], "figures/enhanced/framing_distribution.png"),
+        (plot_theme_category_distribution, ['cluster', 'theme_categories'], "figures/enhanced/theme_categories.png"),
+    ]
+    for directory in {os.path.dirname(output_path) for _, _, output_path in tasks}:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+    # Each plot only gets the columns it reads
+    jobs = [
+        (plot_func, df[[col for col in columns if col in df.columns]], output_path)
+        for plot_func, columns, output_path in tasks
+    ]
+
+    # The plots are independent, so render them in parallel unless this
+    # already runs in a worker
+    if parallel:
+        with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as executor:
+            futures = [executor.submit(_plot_worker, *job) for job in jobs]
+            results = [future.result() for future in as_completed(futures)]
+    else:
+        results = [_plot_worker(*job) for job in jobs]
+
+    for output_path, error in results:
+        if error:
+            logger.error(f"Error generating {output_path}: {error}")
 
     logger.info("Sentiment visualization complete!")
 
@@ -213,13 +258,14 @@ if __name__ == "__main__":
     # Setup logger
     from src.utils.logger import setup_logger
     from src.utils.config_loader import load_config
+    from src.utils.table_io import read_table
 
     logger = setup_logger("sentiment-plots", level=logging.INFO)
     config = load_config()
 
     # Load data
     try:
-        df = pd.read_csv(config.paths.analyzed_data)
+        df = read_table(config.paths.analyzed_data, dtype_backend='pyarrow')
         generate_all_sentiment_plots(df)
     except FileNotFoundError as e:
         logger.error(f"Analyzed data not found at {config.paths.analyzed_data}")
@@ -3,23 +3,48 @@
 import os
 import sys
 import logging
+import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from pathlib import Path
-from datetime import datetime
 from typing import Optional, List
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from src.temporal_analysis import load_historical_runs, compare_theme_trends, calculate_sentiment_trends
+from src.temporal_analysis import (
+    load_historical_summaries, compare_theme_trends, calculate_sentiment_trends
+)
+from src.utils.figure_io import save_figure
+from src.visualizations.sentiment_plots import SENTIMENT_ORDER, SENTIMENT_COLORS
+
+# Resolution of the saved PNGs; bbox_inches='tight' already trims the margins
+TEMPORAL_DPI = 150
+
+# Figure reused by every plot in this module, see _get_figure
+_FIGURE = None
+
+
+def _get_figure(figsize):
+    """Return the module's figure, cleared and resized for the next plot."""
+    global _FIGURE
+    if _FIGURE is None:
+        _FIGURE = plt.figure(figsize=figsize)
+    else:
+        _FIGURE.clear()
+        _FIGURE.set_size_inches(figsize)
+    return _FIGURE
 
 
 def plot_theme_trends(df_trends: pd.DataFrame,
                       top_n: int = 10,
                       cluster: Optional[str] = None,
-                      output_path: str = "figures/theme_trends.png"):
+                      output_path: str = "figures/theme_trends.png",
+                      dpi: int = TEMPORAL_DPI):
     """
     Plot theme prevalence over time.
 
@@ -27,7 +52,8 @@ def plot_theme_trends(df_trends: pd.DataFrame,
         df_trends: DataFrame with dates and theme frequencies
         top_n: Number of top themes to plot
         cluster: Cluster name for title
-        output_path: Where to save the plot
+        output_path: Where to save the plot; the caller creates its directory
+        dpi: Resolution of the saved PNG
     """
     if df_trends.empty:
         print("No data to plot")
@@ -38,14 +64,15 @@ def plot_theme_trends(df_trends: pd.DataFrame,
     top_themes = most_recent.nlargest(top_n).index.tolist()
 
     # Create plot
-    fig, ax = plt.subplots(figsize=(14, 8))
+    fig = _get_figure((14, 8))
+    ax = fig.add_subplot()
 
-    # Convert dates to datetime
-    dates = [datetime.strptime(d, "%Y-%m-%d") for d in df_trends.index]
+    # Convert dates to datetime; plain numpy arrays skip pandas unit handling
+    dates = pd.to_datetime(df_trends.index, format="%Y-%m-%d", cache=True).to_numpy()
 
     # Plot each theme
     for theme in top_themes:
-        values = df_trends[theme].values
+        values = df_trends[theme].to_numpy(dtype=np.float32, copy=False)
         ax.plot(dates, values, marker='o', linewidth=2, label=theme)
 
     # Formatting
@@ -63,53 +90,42 @@ def plot_theme_trends(df_trends: pd.DataFrame,
     # Format x-axis
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
     ax.xaxis.set_major_locator(mdates.DayLocator(interval=max(1, len(dates)//10)))
-    plt.xticks(rotation=45)
-
-    plt.tight_layout()
+    plt.setp(ax.get_xticklabels(), rotation=45)
 
     # Save
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    save_figure(fig, output_path, dpi=dpi, bbox_inches='tight')
     print(f"Saved theme trends plot to {output_path}")
-    plt.close()
+    fig.clear()
 
 
 def plot_sentiment_trends(df_sentiment: pd.DataFrame,
                           cluster: Optional[str] = None,
-                          output_path: str = "figures/sentiment_trends.png"):
+                          output_path: str = "figures/sentiment_trends.png",
+                          dpi: int = TEMPORAL_DPI):
     """
     Plot sentiment distribution over time as stacked area chart.
 
     Args:
         df_sentiment: DataFrame with sentiment percentages over time
         cluster: Cluster name for title
-        output_path: Where to save the plot
+        output_path: Where to save the plot; the caller creates its directory
+        dpi: Resolution of the saved PNG
     """
     if df_sentiment.empty:
         print("No sentiment data to plot")
         return
 
     # Create plot
-    fig, ax = plt.subplots(figsize=(14, 8))
+    fig = _get_figure((14, 8))
+    ax = fig.add_subplot()
 
     # Convert dates to datetime
-    dates = [datetime.strptime(d, "%Y-%m-%d") for d in df_sentiment.index]
-
-    # Define colors for sentiments
-    colors = {
-        'Positive': '#2ecc71',   # Green
-        'Neutral': '#95a5a6',    # Gray
-        'Negative': '#e74c3c',   # Red
-        'Mixed': '#f39c12'       # Orange
-    }
+    dates = pd.to_datetime(df_sentiment.index, format="%Y-%m-%d", cache=True).to_numpy()
 
-    # Stack sentiments
-    sentiments = ['Positive', 'Neutral', 'Negative', 'Mixed']
-    data_to_plot = [df_sentiment[s].values for s in sentiments if s in df_sentiment.columns]
-    labels = [s for s in sentiments if s in df_sentiment.columns]
-    colors_to_plot = [colors[s] for s in labels]
+    # Stack sentiments, one row per sentiment
+    data_to_plot = df_sentiment.reindex(columns=list(SENTIMENT_ORDER), fill_value=0).to_numpy(dtype=np.float32).T
 
-    ax.stackplot(dates, *data_to_plot, labels=labels, colors=colors_to_plot, alpha=0.8)
+    ax.stackplot(dates, data_to_plot, labels=SENTIMENT_ORDER, colors=SENTIMENT_COLORS, alpha=0.8)
 
     # Formatting
     ax.set_xlabel('Date', fontsize=12)
@@ -127,50 +143,54 @@ def plot_sentiment_trends(df_sentiment: pd.DataFrame,
     # Format x-axis
     ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
     ax.xaxis.set_major_locator(mdates.DayLocator(interval=max(1, len(dates)//10)))
-    plt.xticks(rotation=45)
-
-    plt.tight_layout()
+    plt.setp(ax.get_xticklabels(), rotation=45)
 
     # Save
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    save_figure(fig, output_path, dpi=dpi, bbox_inches='tight')
     print(f"Saved sentiment trends plot to {output_path}")
-    plt.close()
+    fig.clear()
 
 
 def plot_theme_velocity(df_trends: pd.DataFrame,
-                       output_path: str = "figures/theme_velocity.png"):
+                       output_path: str = "figures/theme_velocity.png",
+                       dpi: int = TEMPORAL_DPI):
     """
     Plot theme "velocity" (rate of change) to identify surging/declining topics.
 
     Args:
         df_trends: DataFrame with dates and theme frequencies
-        output_path: Where to save the plot
+        output_path: Where to save the plot; the caller creates its directory
+        dpi: Resolution of the saved PNG
     """
     if df_trends.empty or len(df_trends) < 2:
         print("Need at least 2 time points to calculate velocity")
         return
 
     # Calculate change from previous period
-    velocity = df_trends.iloc[-1] - df_trends.iloc[-2]
-
-    # Sort by absolute velocity
-    velocity_sorted = velocity.reindex(velocity.abs().sort_values(ascending=False).index)
+    velocity = (df_trends.iloc[-1] - df_trends.iloc[-2]).to_numpy(dtype=float)
+    themes = df_trends.columns.to_numpy()
 
-    # Take top 15 positive and negative
-    top_gainers = velocity_sorted[velocity_sorted > 0].head(10)
-    top_decliners = velocity_sorted[velocity_sorted < 0].tail(10)
+    # Select the 10 largest gains and declines without sorting every theme
+    k = min(10, len(velocity))
+    gainers = np.argpartition(-velocity, k - 1)[:k]
+    gainers = gainers[velocity[gainers] > 0]
+    gainers = gainers[np.argsort(-velocity[gainers], kind='stable')]
+    decliners = np.argpartition(velocity, k - 1)[:k]
+    decliners = decliners[velocity[decliners] < 0]
+    decliners = decliners[np.argsort(velocity[decliners], kind='stable')]
 
-    combined = pd.concat([top_gainers, top_decliners])
+    positions = np.concatenate([gainers, decliners])
+    changes = velocity[positions]
 
     # Create horizontal bar plot
-    fig, ax = plt.subplots(figsize=(12, 10))
+    fig = _get_figure((12, 10))
+    ax = fig.add_subplot()
 
-    colors = ['#2ecc71' if v > 0 else '#e74c3c' for v in combined.values]
-    ax.barh(range(len(combined)), combined.values, color=colors, alpha=0.7)
+    colors = np.where(changes > 0, '#2ecc71', '#e74c3c')
+    ax.barh(np.arange(len(changes)), changes, color=colors, alpha=0.7)
 
-    ax.set_yticks(range(len(combined)))
-    ax.set_yticklabels(combined.index, fontsize=9)
+    ax.set_yticks(np.arange(len(changes)))
+    ax.set_yticklabels(themes[positions], fontsize=9)
     ax.set_xlabel('Change in Frequency (velocity)', fontsize=12)
     ax.set_title('Theme Velocity: Surging vs. Declining Topics', fontsize=14, fontweight='bold')
 
@@ -185,60 +205,85 @@ def plot_theme_velocity(df_trends: pd.DataFrame,
     ]
     ax.legend(handles=legend_elements, loc='lower right')
 
-    plt.tight_layout()
-
     # Save
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    save_figure(fig, output_path, dpi=dpi, bbox_inches='tight')
     print(f"Saved theme velocity plot to {output_path}")
-    plt.close()
+    fig.clear()
+
+
+def _plot_worker(plot_func, data: pd.DataFrame, kwargs: dict):
+    """Render one plot in a worker process."""
+    try:
+        plot_func(data, **kwargs)
+        return kwargs['output_path'], None
+    except Exception as e:
+        return kwargs['output_path'], str(e)
 
 
 def generate_all_temporal_plots(days_back: int = 30,
-                                clusters: Optional[List[str]] = None):
+                                clusters: Optional[List[str]] = None,
+                                parallel: bool = True):
     """
     Generate all temporal visualizations.
 
     Args:
         days_back: Number of days to analyze
         clusters: List of clusters to analyze (None = all)
+        parallel: Render the plots in a process pool; pass False when
+            already running inside a worker process
     """
     logger = logging.getLogger("temporal-plots")
     logger.info("Generating temporal visualizations...")
 
-    # Load historical data
-    historical_runs = load_historical_runs(days_back)
+    # Load per-snapshot counts; the trends only need these, not the videos
+    theme_runs, sentiment_runs = load_historical_summaries(days_back)
 
-    if len(historical_runs) < 2:
+    if len(sentiment_runs) < 2:
         logger.warning("Need at least 2 historical runs for temporal plots")
         return
 
-    # Overall plots (all clusters)
+    # Overall plots (all clusters); the plots only need single precision
     logger.info("Generating overall trend plots...")
-    theme_trends = compare_theme_trends(historical_runs)
-    sentiment_trends = calculate_sentiment_trends(historical_runs)
+    theme_trends = compare_theme_trends(theme_runs).astype(np.float32)
+    sentiment_trends = calculate_sentiment_trends(sentiment_runs).astype(np.float32)
 
-    plot_theme_trends(theme_trends, output_path="figures/temporal/overall_theme_trends.png")
-    plot_sentiment_trends(sentiment_trends, output_path="figures/temporal/overall_sentiment_trends.png")
-    plot_theme_velocity(theme_trends, output_path="figures/temporal/overall_theme_velocity.png")
+    tasks = [
+        (plot_theme_trends, theme_trends, {'output_path': "figures/temporal/overall_theme_trends.png"}),
+        (plot_sentiment_trends, sentiment_trends, {'output_path': "figures/temporal/overall_sentiment_trends.png"}),
+        (plot_theme_velocity, theme_trends, {'output_path': "figures/temporal/overall_theme_velocity.png"}),
+    ]
 
     # Per-cluster plots
     if clusters:
         for cluster in clusters:
             logger.info(f"Generating plots for {cluster} cluster...")
-            cluster_theme_trends = compare_theme_trends(historical_runs, cluster=cluster)
-            cluster_sentiment_trends = calculate_sentiment_trends(historical_runs, cluster=cluster)
-
-            plot_theme_trends(
-                cluster_theme_trends,
-                cluster=cluster,
-                output_path=f"figures/temporal/{cluster}_theme_trends.png"
-            )
-            plot_sentiment_trends(
-                cluster_sentiment_trends,
-                cluster=cluster,
-                output_path=f"figures/temporal/{cluster}_sentiment_trends.png"
-            )
+            cluster_theme_trends = compare_theme_trends(theme_runs, cluster=cluster).astype(np.float32)
+            cluster_sentiment_trends = calculate_sentiment_trends(sentiment_runs, cluster=cluster).astype(np.float32)
+
+            tasks.append((plot_theme_trends, cluster_theme_trends, {
+                'cluster': cluster,
+                'output_path': f"figures/temporal/{cluster}_theme_trends.png"
+            }))
+            tasks.append((plot_sentiment_trends, cluster_sentiment_trends, {
+                'cluster': cluster,
+                'output_path': f"figures/temporal/{cluster}_sentiment_trends.png"
+            }))
+
+    for directory in {os.path.dirname(kwargs['output_path']) for _, _, kwargs in tasks}:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+
+    # The trend tables are small, so render every plot in parallel unless
+    # this already runs in a worker
+    if parallel:
+        with ProcessPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1)) as executor:
+            futures = [executor.submit(_plot_worker, *task) for task in tasks]
+            results = [future.result() for future in as_completed(futures)]
+    else:
+        results = [_plot_worker(*task) for task in tasks]
+
+    for output_path, error in results:
+        if error:
+            logger.error(f"Error generating {output_path}: {error}")
 
     logger.info("Temporal visualization complete!")
 
@@ -1,60 +1,99 @@
 import os
+import sys
+import numpy as np
 import pandas as pd
+from functools import lru_cache
 from wordcloud import WordCloud, STOPWORDS
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.figure_io import save_figure
+from src.utils.table_io import read_table, table_exists
+
 # --- Configuration ---
 # Determine paths based on execution context
-if os.path.exists("data/cluster_data.csv"):
-    DATA_PATH = "data/cluster_data.csv"
+if table_exists("data/cluster_data.parquet"):
+    DATA_PATH = "data/cluster_data.parquet"
     FIGURES_DIR = "figures"
-elif os.path.exists("../data/cluster_data.csv"):
-    DATA_PATH = "../data/cluster_data.csv"
+elif table_exists("../data/cluster_data.parquet"):
+    DATA_PATH = "../data/cluster_data.parquet"
     FIGURES_DIR = "../figures"
 else:
     # Fallback/Default
-    DATA_PATH = "../data/cluster_data.csv"
+    DATA_PATH = "../data/cluster_data.parquet"
     FIGURES_DIR = "../figures"
 
 WIDTH = 1200
 HEIGHT = 800
 BACKGROUND_COLOR = 'white'
 
-def generate_word_cloud(text, filename, title, extra_stopwords=None, colormap='viridis', background_color='white'):
-    """Generates a word cloud from text and saves it to the figures directory."""
-    
-    # 1. Customize Stopwords
-    # Add common podcast filler words or irrelevant titles
-    custom_stopwords = set(STOPWORDS)
-    custom_stopwords.update(['video', 'youtube', 'podcast', 'show', 'clip', 'live', 'new', 'full', 'episode', 'watch', 'official', 'exclusive', 'what', 'why', 'how', 'when', 'amp', 'gets'])
-    
-    if extra_stopwords:
-        custom_stopwords.update(extra_stopwords)
+# Common podcast filler words or irrelevant titles
+CUSTOM_STOPWORDS = set(STOPWORDS) | {'video', 'youtube', 'podcast', 'show', 'clip', 'live', 'new', 'full', 'episode', 'watch', 'official', 'exclusive', 'what', 'why', 'how', 'when', 'amp', 'gets'}
+
+# WordCloud's default tokenizer
+TOKEN_PATTERN = r"\w[\w']*"
+
+def tokenize(texts):
+    """Splits texts into lower-case words the way WordCloud does, one row per word.
+
+    The result is indexed by the position of the text each word came from.
+    Possessive 's endings and plain numbers are removed.
+    """
+    texts = pd.Series(texts, dtype=object).reset_index(drop=True)
+    words = texts.astype(str).str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+    words = words.where(~words.str.endswith("'s"), words.str[:-2])
+    return words[~words.str.isdigit()]
+
+def word_frequencies(words, extra_stopwords=None):
+    """Counts words, dropping stopwords and folding plurals into their singular like WordCloud."""
+    stopwords = CUSTOM_STOPWORDS | {w.lower() for w in (extra_stopwords or ())}
 
-    # 2. Generate WordCloud object
-    wordcloud = WordCloud(
+    # Count in C over integer codes; first-appearance order keeps WordCloud's tie order
+    codes, uniques = pd.factorize(words[~words.isin(stopwords)])
+    counts = dict(zip(uniques.tolist(), np.bincount(codes, minlength=len(uniques)).tolist()))
+
+    # A word ending in a single 's' counts as the plural of the same word without it
+    for word in list(counts):
+        if word.endswith('s') and not word.endswith('ss') and word[:-1] in counts:
+            counts[word[:-1]] += counts.pop(word)
+    return counts
+
+@lru_cache(maxsize=None)
+def _get_word_cloud(colormap, background_color):
+    """Returns a WordCloud for the given colors, built once and reused for every cloud."""
+    return WordCloud(
         width=1600, # Higher res
         height=900,
         background_color=background_color,
-        stopwords=custom_stopwords,
-        collocations=False, # Avoids counting bigrams like 'new york' as one word
         max_words=150,
         colormap=colormap,
         contour_width=0,
         contour_color='steelblue'
-    ).generate(text.lower())
-    
-    # 3. Plot and Save
+    )
+
+def render_word_cloud(frequencies, filename, title, colormap='viridis', background_color='white'):
+    """Renders a word cloud from word frequencies and saves it to the figures directory."""
+    wordcloud = _get_word_cloud(colormap, background_color).generate_from_frequencies(frequencies)
+
     plt.figure(figsize=(16, 9))
     plt.imshow(wordcloud, interpolation='bilinear')
     plt.axis('off')
     plt.title(title, fontsize=24, pad=20, color='#333333' if background_color == 'white' else 'white')
     
     save_path = os.path.join(FIGURES_DIR, filename)
-    plt.savefig(save_path, bbox_inches='tight', facecolor=background_color)
+    save_figure(plt.gcf(), save_path, bbox_inches='tight', facecolor=background_color)
     plt.close()
     print(f"   -> Saved: {save_path}")
 
+def generate_word_cloud(text, filename, title, extra_stopwords=None, colormap='viridis', background_color='white'):
+    """Generates a word cloud from text and saves it to the figures directory."""
+    frequencies = word_frequencies(tokenize([text]), extra_stopwords)
+    render_word_cloud(frequencies, filename, title, colormap=colormap, background_color=background_color)
+
 def generate_word_clouds(df=None):
     """Main function to generate word clouds for all combined and cluster titles."""
     print("🚀 Starting Word Cloud Generation...")
@@ -62,18 +101,21 @@ def generate_word_clouds(df=None):
     # 1. Check for data
     if df is None:
         try:
-            df = pd.read_csv(DATA_PATH)
+            df = read_table(DATA_PATH)
         except FileNotFoundError:
             print(f"Error: Data file not found at {DATA_PATH}. Run ingest.py first.")
             return
 
     os.makedirs(FIGURES_DIR, exist_ok=True)
+
+    # Tokenize every title once; each cloud only counts its share of the words
+    words = tokenize(df['title'])
+    word_clusters = df['cluster'].to_numpy()[words.index.to_numpy(dtype=int)]
     
     # --- 2. Combined Word Cloud ---
     print("\n[1/2] Generating Combined Titles Word Cloud...")
-    all_titles = " ".join(df['title'].astype(str).tolist())
-    generate_word_cloud(
-        all_titles, 
+    render_word_cloud(
+        word_frequencies(words),
         "combined_titles_wordcloud.png", 
         "Combined Titles Across All Clusters"
     )
@@ -81,15 +123,14 @@ def generate_word_clouds(df=None):
     # --- 3. Cluster Word Clouds ---
     print("\n[2/2] Generating Cluster-Specific Word Clouds...")
     
-    # Group by the cluster column and process each group
-    grouped = df.groupby('cluster')
+    # Group the words by cluster and process each group
+    grouped = words.groupby(word_clusters)
     
-    for cluster_name, group_df in grouped:
+    for cluster_name, cluster_words in grouped:
         print(f"  Processing cluster: {cluster_name}")
-        cluster_titles = " ".join(group_df['title'].astype(str).tolist())
         
-        generate_word_cloud(
-            cluster_titles,
+        render_word_cloud(
+            word_frequencies(cluster_words),
             f"{cluster_name}_wordcloud.png",
             f"Titles for Cluster: {cluster_name.upper()}"
         )
@@ -105,11 +146,11 @@ if __name__ == "__main__":
     os.chdir(script_dir) # Change current working directory to src/ temporarily
     
     # Re-evaluate paths since we changed dir
-    if os.path.exists("data/cluster_data.csv"):
-        DATA_PATH = "data/cluster_data.csv"
+    if table_exists("data/cluster_data.parquet"):
+        DATA_PATH = "data/cluster_data.parquet"
         FIGURES_DIR = "figures"
-    elif os.path.exists("../data/cluster_data.csv"):
-        DATA_PATH = "../data/cluster_data.csv"
+    elif table_exists("../data/cluster_data.parquet"):
+        DATA_PATH = "../data/cluster_data.parquet"
         FIGURES_DIR = "../figures"
 
     generate_word_clouds()
\ No newline at end of file
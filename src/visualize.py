@@ -2,19 +2,133 @@
 
 import os
 import sys
+import time
 import logging
-import pandas as pd
+import matplotlib
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Figures are only written to files; this also applies in the stage workers
+matplotlib.use('Agg')
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.utils.config_loader import load_config
 from src.utils.logger import setup_logger
+from src.utils.table_io import read_table, table_exists, resolve_table_path
+
+
+# Clusters with per-cluster temporal plots
+TEMPORAL_CLUSTERS = ['Left', 'right', 'my-env', 'mainstream', 'manosphere']
+
+
+def _run_word_clouds(analyzed_path: str, cluster_path: str):
+    """Generate word clouds in a worker process."""
+    try:
+        from src.visualizations.word_clouds import generate_word_clouds
+        df_cluster = read_table(cluster_path)
+        generate_word_clouds(df_cluster)
+        return 'word clouds', None
+    except Exception as e:
+        return 'word clouds', str(e)
+
+
+def _run_sentiment_plots(analyzed_path: str, cluster_path: str):
+    """Generate sentiment and framing plots in a worker process."""
+    try:
+        from src.visualizations.sentiment_plots import generate_all_sentiment_plots
+        generate_all_sentiment_plots(read_table(analyzed_path, dtype_backend='pyarrow'), parallel=False)
+        return 'sentiment plots', None
+    except Exception as e:
+        return 'sentiment plots', str(e)
+
+
+def _run_comparison_plots(analyzed_path: str, cluster_path: str):
+    """Generate cross-cluster comparison plots in a worker process."""
+    try:
+        from src.visualizations.cluster_comparison import generate_all_comparison_plots
+        generate_all_comparison_plots(read_table(analyzed_path), source_path=analyzed_path, parallel=False)
+        return 'comparison plots', None
+    except Exception as e:
+        return 'comparison plots', str(e)
+
+
+def _run_temporal_plots(analyzed_path: str, cluster_path: str):
+    """Generate temporal trend plots in a worker process."""
+    try:
+        from src.visualizations.temporal_plots import generate_all_temporal_plots
+        generate_all_temporal_plots(days_back=30, clusters=TEMPORAL_CLUSTERS, parallel=False)
+        return 'temporal plots', None
+    except Exception as e:
+        return 'temporal plots', str(e)
+
+
+VISUALIZATION_STAGES = (
+    _run_word_clouds,
+    _run_sentiment_plots,
+    _run_comparison_plots,
+    _run_temporal_plots,
+)
+
+
+# Marker files touched after a stage finishes without errors
+STAGE_MARKER_DIR = Path("figures/.stages")
 
 
-def generate_all_visualizations():
-    """Generate all available visualizations."""
+def _stage_dependencies(config):
+    """
+    Map each stage to its name, input files and the figures it always writes.
+
+    Figures that depend on the data, such as per-cluster or per-theme plots,
+    are not listed; the stage's marker file tracks those.
+    """
+    analyzed_data = [resolve_table_path(config.paths.analyzed_data)]
+    return {
+        _run_word_clouds: ('word clouds', [resolve_table_path(config.paths.cluster_data)],
+                           [Path('figures/combined_titles_wordcloud.png')]),
+        _run_sentiment_plots: ('sentiment plots', analyzed_data,
+                               [Path('figures/enhanced/sentiment_distribution.png')]),
+        _run_comparison_plots: ('comparison plots', analyzed_data,
+                                [Path('figures/comparison/theme_distribution.png'),
+                                 Path('figures/comparison/consensus_vs_echo.png')]),
+        _run_temporal_plots: ('temporal plots', list(Path('data/historical').glob('*/*')), []),
+    }
+
+
+def _stage_marker(stage_name: str) -> Path:
+    """Return the marker file recording a stage's last successful run."""
+    return STAGE_MARKER_DIR / f"{stage_name.replace(' ', '_')}.done"
+
+
+def _needs_rebuild(inputs, outputs, marker: Path) -> bool:
+    """
+    Check whether a stage has to run again.
+
+    Args:
+        inputs: Paths the stage reads
+        outputs: Figures the stage always writes
+        marker: Marker file touched after the stage last succeeded
+
+    Returns:
+        True if the stage never succeeded, one of its figures is missing or
+        an input changed after its last successful run
+    """
+    inputs = [path for path in inputs if path.exists()]
+    if not inputs or not marker.exists() or not all(path.exists() for path in outputs):
+        return True
+    return max(os.path.getmtime(path) for path in inputs) > os.path.getmtime(marker)
+
+
+def generate_all_visualizations(force: bool = False):
+    """
+    Generate all available visualizations.
+
+    Stages that succeeded after their inputs last changed are skipped.
+
+    Args:
+        force: Regenerate every stage regardless of file modification times
+    """
     # Change to project root if needed
     if os.path.basename(os.getcwd()) == 'src':
         os.chdir('..')
@@ -28,55 +142,58 @@ def generate_all_visualizations():
     logger.info("="*60)
 
     # Check if analyzed data exists
-    if not Path(config.paths.analyzed_data).exists():
+    if not table_exists(config.paths.analyzed_data):
         logger.error(f"Analyzed data not found at {config.paths.analyzed_data}")
         logger.error("Please run analyze.py first.")
         return
 
-    # Load data
-    df = pd.read_csv(config.paths.analyzed_data)
-    logger.info(f"Loaded {len(df)} analyzed videos from {len(df['cluster'].unique())} clusters")
+    clusters = read_table(config.paths.analyzed_data, columns=['cluster'])['cluster']
+    logger.info(f"Loaded {len(clusters)} analyzed videos from {clusters.nunique()} clusters")
 
     # Create output directories
     os.makedirs("figures/enhanced", exist_ok=True)
     os.makedirs("figures/comparison", exist_ok=True)
     os.makedirs("figures/temporal", exist_ok=True)
 
-    # 1. Word Clouds
-    logger.info("\n📊 Generating word clouds...")
-    try:
-        from src.visualizations.word_clouds import generate_word_clouds
-        df_cluster = pd.read_csv(config.paths.cluster_data)
-        generate_word_clouds(df_cluster)
-    except Exception as e:
-        logger.error(f"Error generating word clouds: {e}")
-
-    # 2. Sentiment Plots
-    logger.info("\n📈 Generating sentiment and framing plots...")
-    try:
-        from src.visualizations.sentiment_plots import generate_all_sentiment_plots
-        generate_all_sentiment_plots(df)
-    except Exception as e:
-        logger.error(f"Error generating sentiment plots: {e}")
-
-    # 3. Cross-Cluster Comparison
-    logger.info("\n🌍 Generating cross-cluster comparison plots...")
-    try:
-        from src.visualizations.cluster_comparison import generate_all_comparison_plots
-        generate_all_comparison_plots(df)
-    except Exception as e:
-        logger.error(f"Error generating comparison plots: {e}")
+    dependencies = _stage_dependencies(config)
+    stages = []
+    for stage in VISUALIZATION_STAGES:
+        stage_name, inputs, outputs = dependencies[stage]
+        if force or _needs_rebuild(inputs, outputs, _stage_marker(stage_name)):
+            stages.append(stage)
+        else:
+            logger.info(f"Skipping {stage_name} (figures are up to date)")
+
+    if not stages:
+        logger.info("\n✅ All visualizations are up to date!")
+        return
 
-    # 4. Temporal Trends (if historical data exists)
-    logger.info("\n📅 Generating temporal trend plots...")
-    try:
-        from src.visualizations.temporal_plots import generate_all_temporal_plots
-        generate_all_temporal_plots(
-            days_back=30,
-            clusters=['Left', 'right', 'my-env', 'mainstream', 'manosphere']
-        )
-    except Exception as e:
-        logger.warning(f"Temporal plots skipped (need historical data): {e}")
+    # Markers get the start time, so inputs changed during the run trigger a rebuild
+    started = time.time()
+
+    # The stages write independent figures, so render them in parallel
+    logger.info(f"\n📊 Generating {', '.join(dependencies[stage][0] for stage in stages)}...")
+    with ProcessPoolExecutor(max_workers=len(stages)) as executor:
+        futures = [
+            executor.submit(stage, config.paths.analyzed_data, config.paths.cluster_data)
+            for stage in stages
+        ]
+        for future in as_completed(futures):
+            stage_name, error = future.result()
+            marker = _stage_marker(stage_name)
+            if error is None:
+                STAGE_MARKER_DIR.mkdir(parents=True, exist_ok=True)
+                marker.touch()
+                os.utime(marker, (started, started))
+                logger.info(f"Finished {stage_name}")
+            elif stage_name == 'temporal plots':
+                logger.warning(f"Temporal plots skipped (need historical data): {error}")
+            else:
+                logger.error(f"Error generating {stage_name}: {error}")
+
+            if error is not None:
+                # Partially written figures must not count as up to date
+                marker.unlink(missing_ok=True)
 
     logger.info("\n✅ Visualization generation complete!")
     logger.info("="*60)
@@ -0,0 +1,80 @@
+import sys
+import os
+import pandas as pd
+import pytest
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from cross_cluster_analysis import (
+    extract_themes_by_cluster,
+    calculate_theme_frequency_by_cluster,
+    calculate_cluster_similarity,
+    calculate_cluster_similarity_from_themes,
+    calculate_sentiment_divergence,
+    build_theme_index,
+    build_sentiment_table,
+    load_analyzed_data,
+)
+from utils.table_io import write_table
+
+# --- Fixtures ---
+
+@pytest.fixture
+def analyzed_df():
+    return pd.DataFrame({
+        'cluster': ['Left', 'right', 'right', 'mainstream'],
+        'themes': ['Climate | Economy', 'Economy | Border', None, 'Economy | climate '],
+        'sentiment': ['Positive', 'Negative', None, 'Neutral'],
+    })
+
+# --- Tests ---
+
+def test_sparse_similarity_matches_dense(analyzed_df):
+    """Test that the sparse similarity path matches the dense frequency-matrix path."""
+    themes_by_cluster = extract_themes_by_cluster(analyzed_df)
+
+    dense = calculate_cluster_similarity(calculate_theme_frequency_by_cluster(themes_by_cluster))
+    sparse = calculate_cluster_similarity_from_themes(themes_by_cluster)
+
+    pd.testing.assert_frame_equal(sparse, dense)
+
+
+def test_sentiment_divergence_with_theme_index(analyzed_df):
+    """Test sentiment divergence lookup through the inverted theme index."""
+    theme_index = build_theme_index(analyzed_df)
+    assert sorted(theme_index['economy'].tolist()) == [0, 1, 3]
+
+    divergence = calculate_sentiment_divergence(analyzed_df, 'Economy', theme_index)
+
+    assert list(divergence) == ['Left', 'right', 'mainstream']
+    assert divergence['right'] == {'Positive': 0.0, 'Neutral': 0.0, 'Negative': 100.0, 'Mixed': 0.0}
+    assert calculate_sentiment_divergence(analyzed_df, 'unknown theme', theme_index) == {}
+
+
+def test_sentiment_table_matches_divergence(analyzed_df):
+    """Test that the precomputed table holds each theme's divergence."""
+    table = build_sentiment_table(analyzed_df)
+
+    for theme in ['economy', 'climate', 'border']:
+        divergence = calculate_sentiment_divergence(analyzed_df, theme)
+        expected = pd.DataFrame.from_dict(divergence, orient='index')
+        pd.testing.assert_frame_equal(
+            table.xs(theme, level='theme'), expected, check_dtype=False, check_names=False
+        )
+
+
+def test_load_analyzed_data_prefers_parquet_over_legacy_csv(tmp_path, analyzed_df, caplog):
+    """Test that a legacy CSV is read until the configured Parquet file exists."""
+    parquet_path = tmp_path / "analyzed_data.parquet"
+    config = SimpleNamespace(paths=SimpleNamespace(analyzed_data=str(parquet_path)))
+
+    write_table(analyzed_df.iloc[:2], tmp_path / "analyzed_data.csv")
+    assert load_analyzed_data(config)['cluster'].tolist() == ['Left', 'right']
+
+    write_table(analyzed_df, parquet_path)
+    df = load_analyzed_data(config)
+    assert df['cluster'].tolist() == analyzed_df['cluster'].tolist()
+    assert df['cluster'].dtype == 'category'
+    assert "Ignoring" in caplog.text
@@ -0,0 +1,52 @@
+import sys
+import os
+import json
+from unittest.mock import MagicMock
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from utils import metadata_manager
+from utils.metadata_manager import MetadataManager
+
+# --- Tests ---
+
+def test_pipeline_runs_window_is_capped(tmp_path, monkeypatch):
+    """Test that inline run history is capped while the ndjson log keeps everything."""
+    monkeypatch.setattr(metadata_manager, "MAX_PIPELINE_RUNS", 3)
+    mgr = MetadataManager(str(tmp_path / "metadata.json"), logger=MagicMock())
+
+    for i in range(5):
+        mgr.update_ingest(i)
+
+    assert len(mgr.get_pipeline_runs()) == 3
+    assert [r["videos"] for r in mgr.get_pipeline_runs()] == [2, 3, 4]
+    assert mgr.get_stats()["total_runs"] == 5
+
+    with open(tmp_path / "pipeline_runs.ndjson") as f:
+        history = [json.loads(line) for line in f]
+    assert [r["videos"] for r in history] == [0, 1, 2, 3, 4]
+
+
+def test_legacy_pipeline_runs_are_migrated(tmp_path):
+    """Test that list-of-dict run history is converted to the columnar layout."""
+    legacy_runs = [
+        {"type": "ingest", "timestamp": "2025-01-01T00:00:00", "videos": 10},
+        {"type": "analysis", "timestamp": "2025-01-01T01:00:00",
+         "total_videos": 10, "analyzed": 8, "skipped": 2},
+    ]
+    metadata_path = tmp_path / "metadata.json"
+    metadata_path.write_text(json.dumps({
+        "last_ingest_timestamp": "2025-01-01T00:00:00",
+        "last_analysis_timestamp": "2025-01-01T01:00:00",
+        "total_videos_ingested": 10,
+        "total_videos_analyzed": 8,
+        "pipeline_runs": legacy_runs,
+    }))
+
+    mgr = MetadataManager(str(metadata_path), logger=MagicMock())
+
+    assert "pipeline_runs" not in mgr.metadata
+    assert mgr.metadata["runs"]["type"] == ["ingest", "analysis"]
+    assert mgr.get_pipeline_runs() == legacy_runs
+    assert mgr.get_stats()["total_runs"] == 2
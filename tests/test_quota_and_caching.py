@@ -10,7 +10,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../s
 from utils.logger import QuotaTracker, QuotaExceededException
 from utils.rate_limiter import YouTubeAPIRateLimiter
 from utils.config_loader import load_config
-from ingest import get_recent_videos, resolve_channel_id
+from ingest import (get_recent_videos, resolve_channel_id, save_cluster_data, save_cluster_batches,
+                    prefetch_uploads_playlists)
 
 # --- Fixtures ---
 
@@ -103,6 +104,67 @@ def test_playlist_caching(mock_logger):
     # channels().list() count should remain 1
     assert youtube.channels.return_value.list.call_count == 1
 
+def test_uploads_playlists_prefetched_in_batches(mock_logger):
+    """Test that uncached uploads playlists are fetched 50 channels per call."""
+    quota_tracker = MagicMock()
+    rate_limiter = MagicMock()
+    rate_limiter.rate_limit_youtube_api = lambda f: f
+
+    youtube = MagicMock()
+    channels_list = youtube.channels.return_value.list
+    channels_list.side_effect = lambda id, **kwargs: MagicMock(execute=MagicMock(return_value={
+        'items': [{'id': cid, 'contentDetails': {'relatedPlaylists': {'uploads': 'UU' + cid[2:]}}}
+                  for cid in id.split(',')]
+    }))
+
+    playlist_cache = {"UC0": "UU0"}
+    channel_ids = [f"UC{i}" for i in range(120)]
+    prefetch_uploads_playlists(youtube, channel_ids, playlist_cache, mock_logger, quota_tracker, rate_limiter)
+
+    # 119 uncached channels -> 3 calls of at most 50 IDs
+    assert channels_list.call_count == 3
+    assert all(len(c.kwargs['id'].split(',')) <= 50 for c in channels_list.call_args_list)
+    assert playlist_cache == {cid: 'UU' + cid[2:] for cid in channel_ids}
+    assert quota_tracker.log_youtube_api_call.call_count == 3
+
+def test_playlist_items_revalidated_with_etag(mock_logger):
+    """Test that unchanged playlists are served from cache on 304 Not Modified."""
+    from googleapiclient.errors import HttpError
+
+    quota_tracker = MagicMock()
+    rate_limiter = MagicMock()
+    rate_limiter.rate_limit_youtube_api = lambda f: f
+
+    item = {'snippet': {'title': 'Video', 'publishedAt': '2026-01-01T00:00:00Z',
+                        'resourceId': {'videoId': 'vid1'}}}
+    request = MagicMock(headers={})
+    youtube = MagicMock()
+    youtube.playlistItems.return_value.list.return_value = request
+    request.execute.return_value = {'etag': 'E1', 'items': [item]}
+
+    items_cache = {}
+    playlist_cache = {"UC123": "UU123"}
+    fetch = lambda **kwargs: get_recent_videos(
+        youtube, "UC123", "TestChan", 10, mock_logger, quota_tracker, rate_limiter,
+        playlist_cache=playlist_cache, items_cache=items_cache, **kwargs
+    )
+
+    # 1. First call stores the response and its ETag
+    first = fetch()
+    assert 'If-None-Match' not in request.headers
+    assert items_cache["UU123:10"]['etag'] == 'E1'
+
+    # 2. Revalidation answered with 304 reuses the cached videos
+    request.execute.side_effect = HttpError(MagicMock(status=304), b'')
+    assert fetch() == first
+    assert request.headers['If-None-Match'] == 'E1'
+
+    # 3. force_refresh sends no ETag
+    request.headers.clear()
+    request.execute.side_effect = None
+    fetch(force_refresh=True)
+    assert 'If-None-Match' not in request.headers
+
 def test_resolve_channel_id_cache(mock_logger):
     """Test channel ID resolution caching."""
     quota_tracker = MagicMock()
@@ -126,3 +188,102 @@ def test_resolve_channel_id_cache(mock_logger):
     assert cid == "UC_NEW"
     assert cache["@unknown"] == "UC_NEW"
     youtube.search.assert_called_once()
+
+def test_rate_limit_reason_parsed_once(mock_config, quota_tracker, mock_logger):
+    """Test that 403 quota errors are detected and the reason is cached on the error."""
+    from googleapiclient.errors import HttpError
+
+    limiter = YouTubeAPIRateLimiter(mock_config, quota_tracker, mock_logger)
+
+    resp = MagicMock()
+    resp.status = 403
+    content = json.dumps({'error': {'errors': [{'reason': 'quotaExceeded'}]}}).encode('utf-8')
+    error = HttpError(resp, content)
+
+    assert limiter._is_rate_limit_error(error)
+    assert error._cached_reason == 'quotaExceeded'
+
+    # Subsequent checks use the cached reason instead of re-parsing
+    error.content = b'not json'
+    assert limiter.is_retryable(error)
+
+def test_token_bucket_try_acquire(mock_logger):
+    """Test that try_acquire consumes available tokens and never waits."""
+    from utils.rate_limiter import RateLimiter
+
+    bucket = RateLimiter(requests_per_second=0.001, burst_size=2, logger=mock_logger)
+
+    assert bucket.try_acquire()
+    assert bucket.try_acquire()
+    # Bucket is empty and refills far too slowly for another token
+    assert not bucket.try_acquire()
+
+def test_video_stats_cache_ttl(tmp_path, mock_logger):
+    """Test that cached view counts are served until they exceed the TTL."""
+    from utils.cache_manager import CacheManager
+
+    cache = CacheManager(str(tmp_path / "cache"), mock_logger)
+    cache.save_video_stats({"vid1": 100, "vid2": 5})
+
+    assert cache.get_video_stats(["vid1", "vid2", "vid3"], ttl_seconds=3600) == {"vid1": 100, "vid2": 5}
+    assert cache.cache_misses == 1
+
+    # Entries older than the TTL are treated as misses
+    assert cache.get_video_stats(["vid1"], ttl_seconds=-1) == {}
+
+    # Saving with a TTL evicts expired entries from the cache file
+    cache.save_video_stats({"vid3": 7}, ttl_seconds=-1)
+    assert cache.get_video_stats(["vid1", "vid2", "vid3"], ttl_seconds=3600) == {"vid3": 7}
+
+@pytest.mark.parametrize("suffix", [".parquet", ".csv"])
+def test_incremental_save_appends_only_new_videos(tmp_path, mock_logger, suffix):
+    """Test that incremental saves append unseen videos and keep existing rows."""
+    import pandas as pd
+    from utils.table_io import read_table
+
+    output_path = tmp_path / f"cluster_data{suffix}"
+    first = pd.DataFrame({'video_id': ['a', 'b'], 'cluster': ['Left', 'right'], 'view_count': [1, 2]})
+    assert save_cluster_data(first, output_path, incremental=True, logger=mock_logger) == 2
+
+    second = pd.DataFrame({'cluster': ['right', 'Left'], 'video_id': ['b', 'c'], 'view_count': [20, 3]})
+    assert save_cluster_data(second, output_path, incremental=True, logger=mock_logger) == 3
+
+    df = read_table(output_path)
+    assert df['video_id'].tolist() == ['a', 'b', 'c']
+    assert df['view_count'].tolist() == [1, 2, 3]
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_cluster_batches_saved_as_they_arrive(tmp_path, mock_logger, monkeypatch, suffix):
+    """Test that a full refresh streams batches into one file and an incremental run appends once."""
+    import pandas as pd
+    import ingest
+    from unittest.mock import MagicMock
+    from utils.table_io import read_table, write_table
+
+    output_path = tmp_path / f"cluster_data{suffix}"
+    write_table(pd.DataFrame({'video_id': ['old'], 'cluster': ['Left']}), output_path)
+
+    def batches():
+        yield pd.DataFrame({'video_id': ['a', 'b'], 'cluster': ['Left', 'Left']})
+        # The stored data is only replaced once every batch is written
+        assert read_table(output_path)['video_id'].tolist() == ['old']
+        yield pd.DataFrame({'video_id': ['b', 'c'], 'cluster': ['right', 'right']})
+
+    seen = []
+    total = save_cluster_batches(batches(), output_path, incremental=False, logger=mock_logger, on_batch=seen.append)
+
+    df = read_table(output_path)
+    assert total == 3
+    assert df['video_id'].tolist() == ['a', 'b', 'c']
+    assert df['run_timestamp'].nunique() == 1
+    assert len(seen) == 2
+    assert list(tmp_path.iterdir()) == [output_path]
+    assert save_cluster_batches(iter([]), output_path, incremental=False, logger=mock_logger) is None
+
+    append_table = MagicMock(wraps=ingest.append_table)
+    monkeypatch.setattr(ingest, 'append_table', append_table)
+    new_batches = iter([pd.DataFrame({'video_id': ['c', 'd'], 'cluster': ['right', 'right']}),
+                        pd.DataFrame({'video_id': ['e'], 'cluster': ['Left']})])
+    assert save_cluster_batches(new_batches, output_path, incremental=True, logger=mock_logger) == 5
+    assert append_table.call_count == 1
+    assert read_table(output_path)['video_id'].tolist() == ['a', 'b', 'c', 'd', 'e']
@@ -0,0 +1,138 @@
+import sys
+import os
+import pandas as pd
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Add src to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+import temporal_analysis
+from temporal_analysis import (
+    compare_theme_trends, calculate_sentiment_trends, save_historical_snapshot, load_historical_summaries
+)
+
+# --- Fixtures ---
+
+@pytest.fixture
+def historical_runs():
+    day1 = pd.DataFrame({
+        'cluster': ['Left', 'right', 'Left'],
+        'themes': ['Economy | Climate', 'Border', None],
+        'sentiment': ['Positive', 'Negative', None],
+    })
+    day2 = pd.DataFrame({
+        'cluster': ['right', 'Left'],
+        'themes': ['Border | Economy', 'Economy'],
+        'sentiment': ['Negative', 'Neutral'],
+    })
+    return [('2025-01-01', day1), ('2025-01-02', day2)]
+
+# --- Tests ---
+
+def test_compare_theme_trends_counts(historical_runs):
+    """Test that theme counts are pivoted per snapshot in first-appearance order."""
+    trends = compare_theme_trends(historical_runs)
+
+    assert list(trends.index) == ['2025-01-01', '2025-01-02']
+    assert list(trends.columns) == ['Economy', 'Climate', 'Border']
+    assert trends.loc['2025-01-01'].tolist() == [1, 1, 1]
+    assert trends.loc['2025-01-02'].tolist() == [2, 0, 1]
+
+
+def test_compare_theme_trends_cluster_filter(historical_runs):
+    """Test that the cluster filter restricts counts to one cluster."""
+    trends = compare_theme_trends(historical_runs, cluster='right')
+
+    assert list(trends.columns) == ['Border', 'Economy']
+    assert trends['Border'].tolist() == [1, 1]
+
+
+def test_historical_snapshot_roundtrip(tmp_path, monkeypatch):
+    """Test that saved snapshots load back as theme and sentiment counts."""
+    monkeypatch.chdir(tmp_path)
+    analyzed = tmp_path / "analyzed_data.csv"
+    df = pd.DataFrame({
+        'video_id': ['a', 'b'],
+        'cluster': ['Left', 'right'],
+        'themes': ['Economy | Climate', 'Border'],
+        'sentiment': ['Positive', 'Negative'],
+    })
+    df.to_csv(analyzed, index=False)
+    config = SimpleNamespace(paths=SimpleNamespace(
+        cluster_data=str(tmp_path / "missing.csv"), analyzed_data=str(analyzed)
+    ))
+
+    snapshot_dir = save_historical_snapshot(config, MagicMock())
+    theme_counts, sentiment_counts = load_historical_summaries(days_back=1)
+
+    assert (snapshot_dir / "analyzed_data.csv").exists()
+    assert (snapshot_dir / "analyzed_data.parquet").exists() == temporal_analysis.PARQUET_AVAILABLE
+    if temporal_analysis.PARQUET_AVAILABLE:
+        written = pd.read_parquet(snapshot_dir / temporal_analysis.THEMES_LONG_FILE)
+        assert list(written.columns) == ['cluster', 'theme', 'sentiment']
+
+    assert len(theme_counts) == len(sentiment_counts) == 1
+    assert list(theme_counts[0][1].columns) == ['cluster', 'theme', 'count']
+    assert theme_counts[0][1]['theme'].tolist() == ['Economy', 'Climate', 'Border']
+    assert sentiment_counts[0][1]['count'].tolist() == [1, 1]
+
+
+def test_historical_summaries_match_runs(tmp_path, monkeypatch):
+    """Test that per-snapshot counts give the same trends as the full runs."""
+    monkeypatch.chdir(tmp_path)
+    today = pd.Timestamp.now(tz='UTC').normalize()
+    runs = [((today - pd.Timedelta(days=1)).strftime("%Y-%m-%d"), pd.DataFrame({
+        'cluster': ['Left', 'right', 'Left'],
+        'themes': ['Economy | Climate', 'Border', 'Economy'],
+        'sentiment': ['Positive', 'Negative', 'Positive'],
+    })), (today.strftime("%Y-%m-%d"), pd.DataFrame({
+        'cluster': ['right', 'Left'],
+        'themes': ['Border | Economy', None],
+        'sentiment': ['Negative', 'Neutral'],
+    }))]
+    for day, df in runs:
+        snapshot_dir = tmp_path / "data/historical" / day
+        snapshot_dir.mkdir(parents=True)
+        df.to_csv(snapshot_dir / "analyzed_data.csv", index=False)
+
+    theme_counts, sentiment_counts = load_historical_summaries(days_back=7)
+
+    assert theme_counts[0][1]['count'].tolist() == [2, 1, 1]
+    for cluster in [None, 'Left']:
+        pd.testing.assert_frame_equal(compare_theme_trends(theme_counts, cluster),
+                                      compare_theme_trends(runs, cluster))
+        pd.testing.assert_frame_equal(calculate_sentiment_trends(sentiment_counts, cluster),
+                                      calculate_sentiment_trends(runs, cluster))
+
+
+def test_historical_summaries_cache_invalidated_on_change(tmp_path, monkeypatch):
+    """Test that cached snapshot counts are rebuilt after a snapshot is rewritten."""
+    monkeypatch.chdir(tmp_path)
+    snapshot_dir = tmp_path / "data/historical" / pd.Timestamp.now(tz='UTC').strftime("%Y-%m-%d")
+    snapshot_dir.mkdir(parents=True)
+    snapshot = snapshot_dir / "analyzed_data.csv"
+
+    pd.DataFrame({'cluster': ['Left'], 'themes': ['Economy'], 'sentiment': ['Positive']}).to_csv(snapshot, index=False)
+    first_themes, _ = load_historical_summaries(days_back=1)
+    cache_dir = tmp_path / "data/cache/historical"
+    assert len(list(cache_dir.glob("historical_*.pkl"))) == 1
+
+    # Unchanged snapshots are served from the pickle without reading them
+    monkeypatch.setattr(temporal_analysis, '_read_snapshot_file', MagicMock(side_effect=AssertionError))
+    pd.testing.assert_frame_equal(load_historical_summaries(days_back=1)[0][0][1], first_themes[0][1])
+    monkeypatch.undo()
+    monkeypatch.chdir(tmp_path)
+
+    pd.DataFrame({'cluster': ['right'], 'themes': ['Border'], 'sentiment': ['Negative']}).to_csv(snapshot, index=False)
+    os.utime(snapshot, ns=(snapshot.stat().st_atime_ns, snapshot.stat().st_mtime_ns + 1_000_000))
+    second_themes, _ = load_historical_summaries(days_back=1)
+    assert second_themes[0][1]['theme'].tolist() == ['Border']
+
+    # Older pickles are kept up to the limit, then the least recently used go
+    assert len(list(cache_dir.glob("historical_*.pkl"))) == 2
+    monkeypatch.setattr(temporal_analysis, 'HISTORICAL_CACHE_FILES', 1)
+    os.utime(snapshot, ns=(snapshot.stat().st_atime_ns, snapshot.stat().st_mtime_ns + 1_000_000))
+    load_historical_summaries(days_back=1)
+    assert len(list(cache_dir.glob("historical_*.pkl"))) == 1